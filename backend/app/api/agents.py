@@ -1,14 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 from app import crud, schemas
 from app.database import get_db
+from app.services.greeting_service import is_greeting_fresh, refresh_agent_greeting
 
 router = APIRouter(prefix="/api/agents", tags=["agents"])
 
 @router.post("/", response_model=schemas.Agent)
-def create_agent(agent: schemas.AgentCreate, db: Session = Depends(get_db)):
-    return crud.create_agent(db=db, agent=agent)
+def create_agent(
+    agent: schemas.AgentCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    db_agent = crud.create_agent(db=db, agent=agent)
+    # 인사말은 응답 후 백그라운드에서 미리 생성
+    background_tasks.add_task(refresh_agent_greeting, db_agent.id)
+    return db_agent
 
 @router.get("/", response_model=List[schemas.Agent])
 def read_agents(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
@@ -23,12 +32,33 @@ def read_agent(agent_id: int, db: Session = Depends(get_db)):
     return db_agent
 
 @router.put("/{agent_id}", response_model=schemas.Agent)
-def update_agent(agent_id: int, agent: schemas.AgentUpdate, db: Session = Depends(get_db)):
+def update_agent(
+    agent_id: int,
+    agent: schemas.AgentUpdate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
     db_agent = crud.update_agent(db, agent_id=agent_id, agent=agent)
     if db_agent is None:
         raise HTTPException(status_code=404, detail="Agent not found")
+    # 프롬프트/시나리오 등 인사말 입력이 바뀐 경우에만 다시 생성
+    if not is_greeting_fresh(db_agent):
+        background_tasks.add_task(refresh_agent_greeting, db_agent.id)
     return db_agent
 
+@router.get("/{agent_id}/traces", response_model=List[schemas.ConversationTrace])
+def read_agent_traces(
+    agent_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """기간(since 이상, until 미만) 내 대화별 처리 과정 기록 (최신순)"""
+    if crud.get_agent(db, agent_id=agent_id) is None:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    return crud.get_conversation_traces(db, agent_id, since=since, until=until, limit=min(max(limit, 1), 1000))
+
 @router.delete("/{agent_id}")
 def delete_agent(agent_id: int, db: Session = Depends(get_db)):
     success = crud.delete_agent(db, agent_id=agent_id)
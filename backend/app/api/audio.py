@@ -0,0 +1,83 @@
+import os
+import re
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from app.services.audio_store import get_audio_store
+
+router = APIRouter(tags=["audio"])
+
+# 내용 해시가 이름에 들어간 파일은 내용이 바뀌지 않으므로 영구 캐시 허용
+_CONTENT_HASHED = re.compile(r"[0-9a-f]{64}")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+MEDIA_TYPES = {
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".ogg": "audio/ogg",
+    ".webm": "audio/webm",
+}
+
+def _cache_headers(name: str) -> dict:
+    if _CONTENT_HASHED.search(name):
+        return {"Cache-Control": "public, max-age=31536000, immutable"}
+    return {"Cache-Control": "public, max-age=3600"}
+
+def _file_range(path: str, start: int, end: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+# 이전 /static/audio URL도 같은 저장소에서 제공
+@router.api_route("/api/audio/{name}", methods=["GET", "HEAD"])
+@router.api_route("/static/audio/{name}", methods=["GET", "HEAD"], include_in_schema=False)
+async def get_audio(name: str, request: Request):
+    """음성 파일 제공 (Range 요청 지원)"""
+    store = get_audio_store()
+    if not store.valid_name(name):
+        raise HTTPException(status_code=404, detail="Audio not found")
+    path = store.path(name)
+    try:
+        size = os.stat(path).st_size
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Audio not found")
+
+    media_type = MEDIA_TYPES.get(os.path.splitext(name)[1], "application/octet-stream")
+    headers = {"Accept-Ranges": "bytes", **_cache_headers(name)}
+
+    range_header = request.headers.get("range")
+    match = _RANGE.match(range_header.strip()) if range_header else None
+    first, last = match.groups() if match else ("", "")
+    if not (first or last) or (first and last and int(last) < int(first)):
+        # Range가 없거나 형식이 잘못된/여러 구간 요청이면 무시하고 전체 파일 전송 (RFC 7233)
+        # (FileResponse는 서버가 지원하면 sendfile 사용)
+        return FileResponse(path, media_type=media_type, headers=headers, method=request.method)
+
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # bytes=-N: 마지막 N바이트 (bytes=-0은 만족할 수 없는 범위)
+        start = max(size - int(last), 0) if int(last) else size
+        end = size - 1
+    if start >= size:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+
+    headers.update({
+        "Content-Range": f"bytes {start}-{end}/{size}",
+        "Content-Length": str(end - start + 1)
+    })
+    if request.method == "HEAD":
+        return Response(status_code=206, media_type=media_type, headers=headers)
+    return StreamingResponse(
+        _file_range(path, start, end),
+        status_code=206,
+        media_type=media_type,
+        headers=headers
+    )
@@ -1,42 +1,70 @@
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, BackgroundTasks, WebSocket, WebSocketDisconnect, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Set
+from contextlib import aclosing
 import os
-import tempfile
+import json
+import asyncio
 import uuid
 from app import crud
-from app.database import get_db
-from app.models import Conversation
+from app.database import get_db, SessionLocal
+from app.services.prompts import build_system_prompt
+from app.services.rate_limit import ProviderOverloaded, get_limiter
+from app.services.circuit_breaker import get_breaker
+from app.services.pipeline import Pipeline, PipelineContext, PipelineTimeout, Stage, server_timing
+from app.services import tracing
+from app.services.conversation_writer import PendingConversation, get_conversation_writer
 try:
     from app.services.stt_service import STTService
+    from app.services.stt_stream import create_recognizer
     from app.services.emotion_service import EmotionService
-    from app.services.llm_service import LLMService
+    from app.services.llm_service import LLMService, StreamInterrupted
     from app.services.tts_service import TTSService
+    from app.services.greeting_service import ensure_agent_greeting, default_greeting
 except ImportError:
     # 임시로 더미 클래스 사용
     class STTService:
         def __init__(self, service_type): pass
-        async def speech_to_text(self, path): return "테스트 음성 인식 결과"
+        async def speech_to_text(self, audio, filename="audio.wav"): return "테스트 음성 인식 결과"
+    
+    def create_recognizer(service_type, encoding="LINEAR16", sample_rate=None):
+        raise ValueError("Streaming STT is not available")
     
     class EmotionService:
         def __init__(self, service_type): pass
-        async def analyze_emotion(self, text): return "긍정"
+        async def analyze_emotion(self, text): return "긍정", {}
+    
+    class StreamInterrupted(Exception): pass
     
     class LLMService:
-        def __init__(self, service_type): pass
-        def generate_response(self, message, system_prompt, emotion=None): 
+        def __init__(self, service_type, fallbacks=None): pass
+        def check_capacity(self): pass
+        async def generate_response(self, message, system_prompt, emotion=None, **kwargs): 
             return f"안녕하세요! '{message}'에 대한 응답입니다."
+        async def stream_response(self, message, system_prompt, emotion=None, **kwargs):
+            yield f"안녕하세요! '{message}'에 대한 응답입니다."
     
     class TTSService:
+        server_side = False
         def __init__(self, service_type): pass
         async def text_to_speech(self, text): return None
+    
+    def default_greeting(agent): return f"안녕하세요! {agent.name}입니다. 무엇을 도와드릴까요?"
+    async def ensure_agent_greeting(db, agent): return default_greeting(agent), None
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
+# 한 턴(STT → 감정/LLM → 저장/TTS) 전체의 처리 기한(초)
+CHAT_TIMEOUT = float(os.getenv("CHAT_TIMEOUT", "90"))
+
 class ChatRequest(BaseModel):
     message: str
     use_tts: bool = True
+    use_cache: bool = True  # False면 응답 캐시를 건너뜀
+    stream_tts: bool = True  # 스트리밍 응답에서 문장 단위로 음성을 합성해 audio 이벤트로 전송
+    durable: bool = False  # True면 대화 내역이 DB에 커밋된 뒤 응답
 
 class ChatResponse(BaseModel):
     response: str
@@ -46,6 +74,271 @@ class ChatResponse(BaseModel):
 class GreetingResponse(BaseModel):
     greeting: str
     emotion: Optional[str] = None
+    audio_url: Optional[str] = None
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def _save_late_emotion(emotion_task: asyncio.Future, pending: PendingConversation):
+    """응답 후에 도착한 감정 분석 결과를 대화 내역에 반영 (아직 저장 전이면 INSERT에 합침)"""
+    await asyncio.wait({emotion_task})
+    if emotion_task.cancelled() or emotion_task.exception() is not None:
+        return
+    emotion, emotion_scores = emotion_task.result()
+    if emotion is None and emotion_scores is None:
+        return
+    get_conversation_writer().update(pending, emotion=emotion, emotion_scores=emotion_scores)
+
+def _finish_trace(ctx: PipelineContext, pipeline: "Pipeline", trace: tracing.TurnTrace):
+    pending, _ = ctx.result("persist")
+    get_conversation_writer().update(pending, trace=trace.to_dict(ctx, pipeline.name))
+
+class _TurnSettings:
+    """대화 처리 중에 사용할 에이전트 설정 (요청 DB 세션과 분리)"""
+    
+    def __init__(self, agent):
+        self.agent_id = agent.id
+        self.stt_module = agent.stt_module
+        self.llm_module = agent.llm_module
+        self.llm_fallbacks = agent.llm_fallbacks
+        self.emotion_module = agent.emotion_module
+        self.emotion_deadline_ms = agent.emotion_deadline_ms
+        self.tts_module = agent.tts_module
+        self.cache_ttl = agent.response_cache_ttl
+        self.system_prompt = build_system_prompt(agent)
+
+class _Turn:
+    """파이프라인 단계들이 공유하는 한 턴의 입력과 중간 상태"""
+    
+    def __init__(
+        self,
+        settings: _TurnSettings,
+        message: Optional[str] = None,
+        use_tts: bool = True,
+        use_cache: bool = True,
+        background_tasks: Optional[BackgroundTasks] = None,
+        stream_tts: bool = False,
+        audio: Optional[bytes] = None,
+        filename: str = "audio.wav",
+        durable: bool = False
+    ):
+        self.settings = settings
+        self.message = message
+        self.use_tts = use_tts
+        self.use_cache = use_cache
+        self.background_tasks = background_tasks if background_tasks is not None else BackgroundTasks()
+        self.stream_tts = stream_tts
+        self.audio = audio
+        self.filename = filename
+        self.durable = durable  # 대화 내역 커밋을 기다린 뒤 응답
+        self.speech = None  # 문장 단위 음성 합성 스트림 (stream_tts일 때)
+
+# 파이프라인 단계 (ctx.state는 _Turn)
+
+async def _transcribe(ctx: PipelineContext) -> str:
+    """STT - 음성을 텍스트로 변환 (업로드 내용을 메모리에서 바로 전달)"""
+    turn = ctx.state
+    stt_service = STTService(turn.settings.stt_module)
+    turn.message = await stt_service.speech_to_text(turn.audio, filename=turn.filename)
+    return turn.message
+
+async def _analyze_emotion(ctx: PipelineContext):
+    """감정 인식 (텍스트 기반) - (주요 감정, 감정 점수)"""
+    turn = ctx.state
+    if not turn.settings.emotion_module:
+        return None, None
+    emotion_service = EmotionService(turn.settings.emotion_module)
+    return await emotion_service.analyze_emotion(turn.message)
+
+async def _prompt_emotion(ctx: PipelineContext) -> Optional[str]:
+    """LLM 프롬프트에 사용할 감정 (한도 안에 분석이 끝나지 않으면 None)"""
+    settings = ctx.state.settings
+    if not settings.emotion_module:
+        return None
+    if settings.emotion_deadline_ms is None:
+        emotion, _ = await ctx.get("emotion")
+        return emotion
+    if await ctx.wait("emotion", max(settings.emotion_deadline_ms, 0) / 1000):
+        emotion, _ = ctx.result("emotion")
+        return emotion
+    return None
+
+async def _generate_response(ctx: PipelineContext) -> str:
+    """LLM을 통한 응답 생성"""
+    turn = ctx.state
+    settings = turn.settings
+    llm_service = LLMService(settings.llm_module, settings.llm_fallbacks)
+    
+    def generate(emotion: Optional[str]):
+        return llm_service.generate_response(
+            message=turn.message,
+            system_prompt=settings.system_prompt,
+            emotion=emotion,
+            use_cache=turn.use_cache,
+            cache_ttl=settings.cache_ttl
+        )
+    
+    if not settings.emotion_module or settings.emotion_deadline_ms is None:
+        return await generate(await _prompt_emotion(ctx))
+    
+    # 감정 분석을 기다리지 않고 감정 없이 LLM 생성을 먼저 시작하고, 감정 분석이 한도 안에
+    # 끝나면 감정을 반영한 생성을 함께 실행한다. 감정 반영 결과는 감정 없는 결과가 나온 뒤
+    # 한도(emotion_deadline_ms) 안에 끝날 때만 사용하고, 사용하지 않는 쪽은 취소한다.
+    # (대화 내역은 사용자/세션 구분이 없어 직전 대화의 감정은 다른 사용자의 것일 수 있음)
+    speculative = asyncio.ensure_future(generate(None))
+    conditioned = None
+    try:
+        emotion = await _prompt_emotion(ctx)
+        if emotion is None or speculative.done():
+            return await speculative
+        conditioned = asyncio.ensure_future(generate(emotion))
+        await asyncio.wait({speculative, conditioned}, return_when=asyncio.FIRST_COMPLETED)
+        if not conditioned.done():
+            await asyncio.wait({conditioned}, timeout=max(settings.emotion_deadline_ms, 0) / 1000)
+        if _succeeded(conditioned):
+            return conditioned.result()
+        if not speculative.done() or _succeeded(speculative):
+            return await speculative
+        # 감정 없는 생성이 실패했으면 감정 반영 생성을 끝까지 기다림
+        return await conditioned
+    finally:
+        for task in (speculative, conditioned):
+            if task is not None and not task.done():
+                task.cancel()
+
+def _succeeded(task: asyncio.Future) -> bool:
+    return task.done() and not task.cancelled() and task.exception() is None
+
+async def _stream_response(ctx: PipelineContext) -> str:
+    """LLM 응답을 생성되는 대로 token 이벤트로 전송 (완성된 문장은 바로 음성 합성 시작)"""
+    turn = ctx.state
+    settings = turn.settings
+    # 이미 보낸 토큰은 되돌릴 수 없으므로 감정은 한도까지만 기다리고 늦으면 감정 없이 생성
+    emotion = await _prompt_emotion(ctx)
+    
+    if turn.use_tts and turn.stream_tts and settings.tts_module:
+        tts_service = TTSService(settings.tts_module)
+        if tts_service.server_side:
+            turn.speech = tts_service.open_stream()
+    
+    llm_service = LLMService(settings.llm_module, settings.llm_fallbacks)
+    chunks = []
+    async for delta in llm_service.stream_response(
+        message=turn.message,
+        system_prompt=settings.system_prompt,
+        emotion=emotion,
+        use_cache=turn.use_cache,
+        cache_ttl=settings.cache_ttl
+    ):
+        chunks.append(delta)
+        ctx.emit("token", {"text": delta})
+        if turn.speech is not None:
+            turn.speech.feed(delta)
+            for segment in turn.speech.ready():
+                ctx.emit("audio", segment)
+    if turn.speech is not None:
+        turn.speech.close()
+    return "".join(chunks)
+
+async def _save_conversation(ctx: PipelineContext):
+    """대화 내역 저장 - (저장 대기 중인 대화, 저장한 감정)
+    
+    지연 쓰기 대기열에 넣고 바로 반환한다 (durable이면 커밋될 때까지 대기).
+    """
+    turn = ctx.state
+    # 이미 끝난 감정 분석 결과는 함께 저장하고, 아직 실행 중이면 응답 후에 반영
+    emotion, emotion_scores = ctx.result("emotion", (None, None))
+    pending = await get_conversation_writer().add({
+        "agent_id": turn.settings.agent_id,
+        "user_message": turn.message,
+        "agent_response": ctx.result("llm"),
+        "emotion": emotion,
+        "emotion_scores": emotion_scores
+    }, durable=turn.durable)
+    
+    if not ctx.done("emotion"):
+        turn.background_tasks.add_task(_save_late_emotion, ctx.task("emotion"), pending)
+    return pending, emotion
+
+async def _synthesize(ctx: PipelineContext) -> Optional[str]:
+    """TTS 음성 생성 (문장 단위 합성 중이면 남은 문장을 audio 이벤트로 전송)"""
+    turn = ctx.state
+    if turn.speech is not None:
+        async for segment in turn.speech.remaining():
+            ctx.emit("audio", segment)
+        return None
+    if not (turn.use_tts and turn.settings.tts_module):
+        return None
+    tts_service = TTSService(turn.settings.tts_module)
+    return await tts_service.text_to_speech(ctx.result("llm"))
+
+def _turn_pipeline(name: str, respond, transcribe: bool = False) -> Pipeline:
+    """[STT →] 감정 분석과 LLM 생성을 동시에 시작 → DB 저장과 TTS를 동시에 실행
+    
+    감정 분석은 LLM 단계가 필요한 만큼만 기다리므로 background 단계로 둔다.
+    """
+    entry = ("stt",) if transcribe else ()
+    stages = [Stage("stt", _transcribe)] if transcribe else []
+    return Pipeline(name, stages + [
+        Stage("emotion", _analyze_emotion, after=entry, optional=True, default=(None, None), background=True),
+        Stage("llm", respond, after=entry),
+        Stage("persist", _save_conversation, after=("llm",)),
+        Stage("tts", _synthesize, after=("llm",), optional=True)
+    ])
+
+CHAT_PIPELINE = _turn_pipeline("chat", _generate_response)
+STREAM_PIPELINE = _turn_pipeline("chat_stream", _stream_response)
+VOICE_PIPELINE = _turn_pipeline("voice", _generate_response, transcribe=True)
+
+async def _turn_events(
+    settings: _TurnSettings,
+    message: str,
+    use_tts: bool,
+    use_cache: bool,
+    background_tasks: BackgroundTasks,
+    stream_tts: bool = False
+):
+    """한 턴의 응답을 (이벤트, 데이터)로 생성: token/audio 이벤트들 다음에 done 또는 error
+    
+    stream_tts면 응답 생성 중에 문장이 완성될 때마다 음성을 합성하고 audio 이벤트
+    ({index, text, audio_url})를 문장 순서대로 보낸다. 이때 done의 audio_url은 None이다.
+    """
+    turn = _Turn(settings, message, use_tts, use_cache, background_tasks, stream_tts=stream_tts)
+    ctx = PipelineContext(turn, timeout=CHAT_TIMEOUT)
+    trace = tracing.start_trace()
+    try:
+        async with aclosing(STREAM_PIPELINE.stream(ctx)) as events:
+            async for event, data in events:
+                yield event, data
+        
+        _finish_trace(ctx, STREAM_PIPELINE, trace)
+        pending, emotion = ctx.result("persist")
+        yield "done", {
+            "response": ctx.result("llm"),
+            "emotion": emotion,
+            # 음성 전송 중에 대부분 저장이 끝나므로 보통 바로 반환됨
+            "conversation_id": await pending.wait(),
+            "audio_url": ctx.result("tts")
+        }
+    
+    except ProviderOverloaded as e:
+        yield "error", {
+            "detail": "요청이 많아 잠시 후 다시 시도해주세요.",
+            "retry_after": e.retry_after_header
+        }
+    except PipelineTimeout as e:
+        print(f"Chat stream timeout: {e}")
+        yield "error", {"detail": "응답 시간이 초과되었습니다."}
+    except StreamInterrupted as e:
+        # 이미 보낸 토큰은 완성된 응답이 아니므로 저장하지 않고 잘렸음을 알림
+        print(f"Chat stream interrupted: {e}")
+        yield "error", {"detail": "응답 생성이 중간에 중단되었습니다.", "truncated": True}
+    except Exception as e:
+        print(f"Chat stream error: {e}")
+        yield "error", {"detail": "대화 처리 중 오류가 발생했습니다."}
+    finally:
+        if turn.speech is not None:
+            turn.speech.cancel()
 
 @router.get("/{agent_id}/greeting", response_model=GreetingResponse)
 async def get_agent_greeting(
@@ -58,33 +351,20 @@ async def get_agent_greeting(
         raise HTTPException(status_code=404, detail="Agent not found")
     
     try:
-        # LLM을 통한 맞춤형 인사말 생성
-        llm_service = LLMService(agent.llm_module)
-        
-        # 시스템 프롬프트와 시나리오 조합
-        system_prompt = agent.prompt or "당신은 도움이 되는 AI 어시스턴트입니다."
-        if agent.scenario:
-            system_prompt += f"\n\n시나리오: {agent.scenario}"
-        
-        # 인사말 생성을 위한 프롬프트
-        greeting_prompt = "사용자가 처음 대화를 시작했습니다. 당신의 성격과 역할에 맞는 짧은 인사말을 한 문장으로 해주세요. 자기소개와 함께 도움을 제공할 준비가 되었음을 알려주세요."
-        
-        greeting_text = llm_service.generate_response(
-            message=greeting_prompt,
-            system_prompt=system_prompt,
-            emotion=None
-        )
+        # 에이전트 생성/수정 시 미리 생성된 인사말 사용 (없거나 오래된 경우에만 LLM 호출)
+        greeting_text, audio_url = await ensure_agent_greeting(db, agent)
         
         return GreetingResponse(
             greeting=greeting_text,
-            emotion=None
+            emotion=None,
+            audio_url=audio_url
         )
         
     except Exception as e:
         print(f"Greeting generation error: {e}")
         # 에러 발생시 기본 인사말 반환
         return GreetingResponse(
-            greeting=f"안녕하세요! {agent.name}입니다. 무엇을 도와드릴까요?",
+            greeting=default_greeting(agent),
             emotion=None
         )
 
@@ -92,6 +372,8 @@ async def get_agent_greeting(
 async def chat_with_agent(
     agent_id: int, 
     request: ChatRequest, 
+    response: Response,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     # 에이전트 정보 조회
@@ -99,59 +381,254 @@ async def chat_with_agent(
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     
+    turn = _Turn(
+        _TurnSettings(agent),
+        request.message,
+        use_tts=request.use_tts,
+        use_cache=request.use_cache,
+        background_tasks=background_tasks,
+        durable=request.durable
+    )
+    trace = tracing.start_trace()
     try:
-        # 1. 감정 인식 (텍스트 기반)
-        emotion = None
-        emotion_scores = None
-        if agent.emotion_module:
-            emotion_service = EmotionService(agent.emotion_module)
-            emotion, emotion_scores = await emotion_service.analyze_emotion(request.message)
-        
-        # 2. LLM을 통한 응답 생성
-        llm_service = LLMService(agent.llm_module)
-        
-        # 시스템 프롬프트와 시나리오 조합
-        system_prompt = agent.prompt or "당신은 도움이 되는 AI 어시스턴트입니다."
-        if agent.scenario:
-            system_prompt += f"\n\n시나리오: {agent.scenario}"
-        
-        response_text = llm_service.generate_response(
-            message=request.message,
-            system_prompt=system_prompt,
-            emotion=emotion
-        )
-        
-        # 3. 대화 내역 DB에 저장
-        conversation = Conversation(
-            agent_id=agent_id,
-            user_message=request.message,
-            agent_response=response_text,
-            emotion=emotion,
-            emotion_scores=emotion_scores
-        )
-        db.add(conversation)
-        db.commit()
-        
-        # 4. TTS 음성 생성
-        audio_url = None
-        if request.use_tts and agent.tts_module:
-            tts_service = TTSService(agent.tts_module)
-            audio_url = await tts_service.text_to_speech(response_text)
-        
-        return ChatResponse(
-            response=response_text,
-            emotion=emotion,
-            audio_url=audio_url
-        )
-        
+        ctx = await CHAT_PIPELINE.run(PipelineContext(turn, timeout=CHAT_TIMEOUT))
+    except ProviderOverloaded:
+        # main.py의 핸들러가 429/503 + Retry-After로 변환
+        raise
+    except PipelineTimeout as e:
+        print(f"Chat timeout: {e}")
+        raise HTTPException(status_code=504, detail="응답 시간이 초과되었습니다.")
     except Exception as e:
         print(f"Chat error: {e}")
         raise HTTPException(status_code=500, detail="대화 처리 중 오류가 발생했습니다.")
+    
+    _finish_trace(ctx, CHAT_PIPELINE, trace)
+    response.headers["Server-Timing"] = server_timing(ctx)
+    _, emotion = ctx.result("persist")
+    return ChatResponse(
+        response=ctx.result("llm"),
+        emotion=emotion,
+        audio_url=ctx.result("tts")
+    )
+
+@router.post("/{agent_id}/stream")
+async def stream_chat_with_agent(
+    agent_id: int, 
+    request: ChatRequest, 
+    db: Session = Depends(get_db)
+):
+    """토큰 단위 스트리밍 응답 (Server-Sent Events)
+    
+    token 이벤트로 생성 중인 텍스트 조각을 보내고, 마지막 done 이벤트에
+    전체 응답, 감정, 저장된 대화 ID, 음성 URL을 담아 보낸다.
+    stream_tts면 문장이 완성될 때마다 audio 이벤트로 문장별 음성 URL을 보낸다.
+    """
+    # 에이전트 정보 조회
+    agent = crud.get_agent(db, agent_id)
+    if not agent:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    
+    # 스트리밍 중에는 요청 세션 수명에 의존하지 않도록 설정을 미리 복사
+    settings = _TurnSettings(agent)
+    
+    # 스트리밍 응답 헤더를 보내기 전에 LLM 대기열 포화 여부를 확인하여 즉시 실패
+    LLMService(settings.llm_module, settings.llm_fallbacks).check_capacity()
+    
+    # 한도 안에 끝나지 않은 감정 분석은 스트림이 끝난 뒤 저장
+    background_tasks = BackgroundTasks()
+    
+    async def event_stream():
+        async for event, data in _turn_events(
+            settings, request.message, request.use_tts, request.use_cache, background_tasks,
+            stream_tts=request.stream_tts
+        ):
+            yield _sse_event(event, data)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        },
+        background=background_tasks
+    )
+
+@router.websocket("/voice/{agent_id}/stream")
+async def stream_voice_chat(
+    websocket: WebSocket,
+    agent_id: int,
+    encoding: str = "LINEAR16",
+    sample_rate: Optional[int] = None,
+    use_tts: bool = True,
+    stream_tts: bool = True
+):
+    """발화 중에 오디오를 받아 인식하는 음성 대화 (WebSocket)
+    
+    클라이언트는 오디오 청크를 바이너리 메시지로 보내고, 발화가 끝나면
+    {"type": "end"}를 보낸다. 프로바이더가 먼저 발화 끝을 감지하면 서버가 endpoint
+    메시지를 보내고 바로 응답을 시작하며, 클라이언트의 end까지 도착한 오디오는 버린다.
+    서버는 인식 중간 결과(partial), (endpoint), 최종 인식 결과(transcript),
+    응답 토큰(token), 완료(done) 메시지를 순서대로 보낸다.
+    stream_tts면 토큰 사이에 문장별 음성(audio) 메시지가 섞여서 온다.
+    하나의 연결에서 여러 번 발화할 수 있다.
+    오디오 형식은 쿼리의 encoding/sample_rate로 알리며, WEBM_OPUS에서 sample_rate를
+    생략하면 컨테이너 헤더의 값(브라우저는 보통 48kHz)을 사용한다.
+    """
+    await websocket.accept()
+    
+    db = SessionLocal()
+    try:
+        agent = crud.get_agent(db, agent_id)
+        settings = _TurnSettings(agent) if agent else None
+    finally:
+        db.close()
+    if settings is None:
+        await websocket.send_json({"type": "error", "detail": "Agent not found"})
+        await websocket.close(code=1008)
+        return
+    
+    draining = None
+    try:
+        while True:
+            if draining is not None:
+                # 이전 발화의 남은 오디오를 클라이언트의 end까지 받아서 버림
+                await draining
+                draining = None
+            try:
+                transcribed_text, draining = await _transcribe_utterance(
+                    websocket, settings.stt_module, encoding, sample_rate
+                )
+            except WebSocketDisconnect:
+                raise
+            except ProviderOverloaded as e:
+                await websocket.send_json({
+                    "type": "error",
+                    "detail": "요청이 많아 잠시 후 다시 시도해주세요.",
+                    "retry_after": e.retry_after_header
+                })
+                continue
+            except Exception as e:
+                print(f"Streaming STT error: {e}")
+                await websocket.send_json({"type": "error", "detail": "음성 인식 중 오류가 발생했습니다."})
+                continue
+            
+            await websocket.send_json({"type": "transcript", "text": transcribed_text})
+            
+            # 발화가 끝나자마자 응답 생성 시작
+            background_tasks = BackgroundTasks()
+            async for event, data in _turn_events(
+                settings, transcribed_text, use_tts, True, background_tasks, stream_tts=stream_tts
+            ):
+                await websocket.send_json({"type": event, **data})
+            _run_in_background(background_tasks)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if draining is not None and not draining.done():
+            draining.cancel()
+
+async def _transcribe_utterance(websocket: WebSocket, stt_module: str, encoding: str, sample_rate: Optional[int]):
+    """발화가 끝날 때까지 오디오 청크를 스트리밍 인식하고 (최종 인식 결과, 남은 오디오 수신 작업) 반환
+    
+    발화 끝은 클라이언트의 end와 프로바이더의 발화 끝 감지 중 먼저 온 것으로 판단한다.
+    프로바이더가 먼저 감지했으면 endpoint 메시지를 보내고, 클라이언트의 end까지 오디오를
+    받아서 버리는 작업을 함께 반환한다 (없으면 None, 다음 발화 전에 끝나기를 기다려야 함).
+    인식 중간 결과는 partial 메시지로 바로 전송한다. 인식에 실패해도
+    해당 발화의 남은 오디오는 끝까지 받아서 버린다.
+    """
+    name = f"{stt_module}_stt"
+    breaker = get_breaker(name)
+    recognizer = None
+    receiving = None
+    received_end = False
+    writing = True
+    
+    async def on_chunk(chunk: bytes):
+        if writing:
+            await recognizer.write(chunk)
+    
+    try:
+        breaker.check()
+        async with get_limiter(name).limit():
+            recognizer = create_recognizer(stt_module, encoding, sample_rate)
+            forward = None
+            try:
+                await recognizer.start()
+                forward = asyncio.ensure_future(_forward_partials(websocket, recognizer))
+                receiving = asyncio.ensure_future(_receive_audio(websocket, on_chunk))
+                ended = asyncio.ensure_future(recognizer.ended.wait())
+                try:
+                    await asyncio.wait({receiving, ended}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    ended.cancel()
+                if receiving.done():
+                    receiving.result()
+                    receiving = None
+                    received_end = True
+                else:
+                    writing = False
+                    await websocket.send_json({"type": "endpoint"})
+                async with breaker.call():
+                    return await recognizer.finish(), receiving
+            finally:
+                if forward is not None:
+                    forward.cancel()
+                await recognizer.close()
+    except WebSocketDisconnect:
+        if receiving is not None:
+            receiving.cancel()
+        raise
+    except Exception:
+        writing = False
+        if receiving is not None:
+            await receiving
+        elif not received_end:
+            await _receive_audio(websocket, None)
+        raise
+
+async def _receive_audio(websocket: WebSocket, on_chunk):
+    """{"type": "end"}를 받을 때까지 오디오 청크를 on_chunk로 전달 (None이면 버림)"""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        if message.get("bytes"):
+            if on_chunk is not None:
+                await on_chunk(message["bytes"])
+        elif message.get("text"):
+            try:
+                control = json.loads(message["text"])
+            except ValueError:
+                continue
+            if control.get("type") == "end":
+                return
+
+async def _forward_partials(websocket: WebSocket, recognizer):
+    last = None
+    while True:
+        text = await recognizer.partials.get()
+        if text and text != last:
+            last = text
+            await websocket.send_json({"type": "partial", "text": text})
+
+_background: Set[asyncio.Task] = set()
+
+def _run_in_background(background_tasks: BackgroundTasks):
+    """HTTP 응답이 없는 WebSocket 대화에서 BackgroundTasks 실행"""
+    if not background_tasks.tasks:
+        return
+    task = asyncio.ensure_future(background_tasks())
+    _background.add(task)
+    task.add_done_callback(_background.discard)
 
 @router.post("/voice/{agent_id}")
 async def chat_with_voice(
     agent_id: int,
+    response: Response,
+    background_tasks: BackgroundTasks,
     audio: UploadFile = File(...),
+    durable: bool = Form(False),
     db: Session = Depends(get_db)
 ):
     # 에이전트 정보 조회
@@ -159,53 +636,31 @@ async def chat_with_voice(
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     
+    turn = _Turn(
+        _TurnSettings(agent),
+        background_tasks=background_tasks,
+        audio=await audio.read(),
+        filename=audio.filename or "audio.wav",
+        durable=durable
+    )
+    trace = tracing.start_trace()
     try:
-        # 1. STT - 음성을 텍스트로 변환
-        stt_service = STTService(agent.stt_module)
-        
-        # 임시 파일로 저장
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp_file:
-            content = await audio.read()
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
-        
-        try:
-            transcribed_text = await stt_service.speech_to_text(tmp_file_path)
-        finally:
-            # 임시 파일 삭제
-            os.unlink(tmp_file_path)
-        
-        # 2. 감정 인식
-        emotion = None
-        if agent.emotion_module:
-            emotion_service = EmotionService(agent.emotion_module)
-            emotion = await emotion_service.analyze_emotion(transcribed_text)
-        
-        # 3. LLM 응답 생성
-        llm_service = LLMService(agent.llm_module)
-        system_prompt = agent.prompt or "당신은 도움이 되는 AI 어시스턴트입니다."
-        if agent.scenario:
-            system_prompt += f"\n\n시나리오: {agent.scenario}"
-        
-        response_text = llm_service.generate_response(
-            message=transcribed_text,
-            system_prompt=system_prompt,
-            emotion=emotion
-        )
-        
-        # 4. TTS 음성 생성
-        audio_url = None
-        if agent.tts_module:
-            tts_service = TTSService(agent.tts_module)
-            audio_url = await tts_service.text_to_speech(response_text)
-        
-        return {
-            "transcribed_text": transcribed_text,
-            "response": response_text,
-            "emotion": emotion,
-            "audio_url": audio_url
-        }
-        
+        ctx = await VOICE_PIPELINE.run(PipelineContext(turn, timeout=CHAT_TIMEOUT))
+    except ProviderOverloaded:
+        raise
+    except PipelineTimeout as e:
+        print(f"Voice chat timeout: {e}")
+        raise HTTPException(status_code=504, detail="응답 시간이 초과되었습니다.")
     except Exception as e:
         print(f"Voice chat error: {e}")
-        raise HTTPException(status_code=500, detail="음성 대화 처리 중 오류가 발생했습니다.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="음성 대화 처리 중 오류가 발생했습니다.")
+    
+    _finish_trace(ctx, VOICE_PIPELINE, trace)
+    response.headers["Server-Timing"] = server_timing(ctx)
+    _, emotion = ctx.result("persist")
+    return {
+        "transcribed_text": ctx.result("stt"),
+        "response": ctx.result("llm"),
+        "emotion": emotion,
+        "audio_url": ctx.result("tts")
+    }
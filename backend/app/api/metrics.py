@@ -0,0 +1,77 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from app.database import engine
+from app.services import metrics
+from app.services.rate_limit import all_limiters
+from app.services.circuit_breaker import all_breakers, CLOSED, HALF_OPEN, OPEN
+from app.services.cache import response_cache
+from app.services.emotion_service import emotion_cache
+from app.services.tts_service import tts_cache
+from app.services.conversation_writer import get_conversation_writer
+
+router = APIRouter(tags=["metrics"])
+
+BREAKER_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+def _provider_families():
+    limiters = all_limiters()
+    breakers = all_breakers()
+    yield ("seni_provider_in_flight", "gauge", "Provider calls currently holding a concurrency slot",
+           [({"provider": name}, limiter.in_flight) for name, limiter in limiters.items()])
+    yield ("seni_provider_waiting", "gauge", "Provider calls waiting for a rate or concurrency slot",
+           [({"provider": name}, limiter.waiting) for name, limiter in limiters.items()])
+    yield ("seni_provider_concurrency_limit", "gauge", "Configured provider concurrency limit",
+           [({"provider": name}, limiter.max_concurrency) for name, limiter in limiters.items()])
+    yield ("seni_provider_rejected_total", "counter", "Provider calls rejected before being sent",
+           [({"provider": name, "reason": "rate_limit"}, limiter.rejected) for name, limiter in limiters.items()]
+           + [({"provider": name, "reason": "circuit_open"}, breaker.rejected) for name, breaker in breakers.items()])
+    yield ("seni_circuit_breaker_state", "gauge", "Circuit breaker state (0=closed, 1=half_open, 2=open)",
+           [({"provider": name}, BREAKER_STATE_VALUES[breaker.state]) for name, breaker in breakers.items()])
+
+def _cache_families():
+    caches = {
+        "response": response_cache.stats(),
+        "emotion": emotion_cache.stats(),
+        "tts": tts_cache.stats()
+    }
+    yield ("seni_cache_hits_total", "counter", "Cache hits",
+           [({"cache": name}, stats["hits"]) for name, stats in caches.items()])
+    yield ("seni_cache_misses_total", "counter", "Cache misses",
+           [({"cache": name}, stats["misses"]) for name, stats in caches.items()])
+    yield ("seni_cache_hit_ratio", "gauge", "Cache hit ratio since process start",
+           [({"cache": name}, stats["hit_ratio"]) for name, stats in caches.items()])
+    yield ("seni_cache_bytes", "gauge", "Approximate bytes held by the cache",
+           [({"cache": name}, stats.get("bytes")) for name, stats in caches.items()])
+
+def _db_pool_families():
+    # QueuePool 계열만 크기 정보를 제공 (SQLite 등 다른 풀은 건너뜀)
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return
+    yield ("seni_db_pool_size", "gauge", "Database connection pool size",
+           [({}, pool.size())])
+    yield ("seni_db_pool_checked_out", "gauge", "Database connections currently in use",
+           [({}, pool.checkedout())])
+    yield ("seni_db_pool_overflow", "gauge", "Database connections opened beyond the pool size",
+           [({}, max(pool.overflow(), 0))])
+
+def _writer_families():
+    stats = get_conversation_writer().stats()
+    yield ("seni_conversation_write_pending", "gauge", "Conversations waiting in the write-behind queue",
+           [({}, stats["pending"])])
+    yield ("seni_conversation_write_rows_total", "counter", "Conversation rows inserted by the write-behind queue",
+           [({}, stats["rows"])])
+    yield ("seni_conversation_write_batches_total", "counter", "Write-behind batches committed",
+           [({}, stats["batches"])])
+    yield ("seni_conversation_write_failed_total", "counter", "Conversation writes that failed",
+           [({}, stats["failed"])])
+
+metrics.registry.add_collector(_provider_families)
+metrics.registry.add_collector(_cache_families)
+metrics.registry.add_collector(_db_pool_families)
+metrics.registry.add_collector(_writer_families)
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus 텍스트 형식 계측값 (collector가 읽는 리미터/대기열 상태와 같은 이벤트 루프에서 수집)"""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
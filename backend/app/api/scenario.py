@@ -3,12 +3,15 @@ from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import json
 from app.services.llm_service import LLMService
+from app.services.cache import response_cache
+from app.services.rate_limit import ProviderOverloaded
 
 router = APIRouter()
 
 class ScenarioConvertRequest(BaseModel):
     scenario_text: str
     llm_module: str = "gpt"  # 기본값으로 GPT 사용
+    use_cache: bool = True
 
 class Node(BaseModel):
     id: str
@@ -80,9 +83,12 @@ async def convert_scenario_to_flow(request: ScenarioConvertRequest):
 
         user_message = f"다음 시나리오를 플로우 차트 구조로 변환해주세요:\n\n{request.scenario_text}"
         
-        response = llm_service.generate_response(
+        response = await llm_service.generate_response(
             message=user_message,
-            system_prompt=system_prompt
+            system_prompt=system_prompt,
+            use_cache=request.use_cache,
+            # 시나리오 변환은 대화 맥락과 무관하므로 기본 TTL로 캐시
+            cache_ttl=response_cache.default_ttl
         )
         
         # JSON 파싱 시도
@@ -151,6 +157,8 @@ async def convert_scenario_to_flow(request: ScenarioConvertRequest):
                 ]
             )
             
+    except ProviderOverloaded:
+        raise
     except Exception as e:
         print(f"시나리오 변환 오류: {e}")
         raise HTTPException(status_code=500, detail="시나리오 변환 중 오류가 발생했습니다.")
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from app import models, schemas
 from typing import List, Optional
+from datetime import datetime
 
 def get_agent(db: Session, agent_id: int) -> Optional[models.Agent]:
     return db.query(models.Agent).filter(models.Agent.id == agent_id).first()
@@ -25,6 +26,38 @@ def update_agent(db: Session, agent_id: int, agent: schemas.AgentUpdate) -> Opti
         db.refresh(db_agent)
     return db_agent
 
+def update_agent_greeting(
+    db: Session,
+    db_agent: models.Agent,
+    greeting: str,
+    audio_url: Optional[str],
+    greeting_hash: str
+) -> models.Agent:
+    db_agent.greeting = greeting
+    db_agent.greeting_audio_url = audio_url
+    db_agent.greeting_hash = greeting_hash
+    db.commit()
+    db.refresh(db_agent)
+    return db_agent
+
+def get_conversation_traces(
+    db: Session,
+    agent_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 100
+) -> List[models.Conversation]:
+    """에이전트의 기간 내 대화 중 처리 과정이 기록된 것 (최신순)"""
+    query = db.query(models.Conversation).filter(
+        models.Conversation.agent_id == agent_id,
+        models.Conversation.trace.isnot(None)
+    )
+    if since is not None:
+        query = query.filter(models.Conversation.created_at >= since)
+    if until is not None:
+        query = query.filter(models.Conversation.created_at < until)
+    return query.order_by(models.Conversation.created_at.desc()).limit(limit).all()
+
 def delete_agent(db: Session, agent_id: int) -> bool:
     db_agent = get_agent(db, agent_id)
     if db_agent:
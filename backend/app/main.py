@@ -1,13 +1,25 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from app.database import engine, Base
-from app.api import agents, chat, scenario
 from dotenv import load_dotenv
-import os
 
+# 서비스 모듈이 import 시점에 환경변수를 읽으므로 가장 먼저 로드
 load_dotenv()
 
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from app.database import engine, Base
+from app.api import agents, chat, scenario, audio, metrics
+from app.services.clients import close_clients
+from app.services.hume_stream import close_hume_stream
+from app.services.rate_limit import ProviderOverloaded
+from app.services.circuit_breaker import breaker_states, OPEN
+from app.services.cache import response_cache
+from app.services.emotion_service import emotion_cache
+from app.services.tts_service import tts_cache
+from app.services.audio_store import run_audio_gc
+from app.services.conversation_writer import get_conversation_writer
+import os
+import asyncio
+
 Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
@@ -24,21 +36,58 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 정적 파일 서빙 (오디오 파일용)
-os.makedirs("/tmp/static/audio", exist_ok=True)
-app.mount("/static", StaticFiles(directory="/tmp/static"), name="static")
-
 app.include_router(agents.router)
 app.include_router(chat.router)
+app.include_router(audio.router)
+app.include_router(metrics.router)
 app.include_router(scenario.router, prefix="/api/scenario", tags=["scenario"])
 
+@app.exception_handler(ProviderOverloaded)
+async def provider_overloaded_handler(request: Request, exc: ProviderOverloaded):
+    # 외부 프로바이더 포화 시 타임아웃까지 기다리지 않고 즉시 거절
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": "요청이 많아 잠시 후 다시 시도해주세요.", "provider": exc.provider},
+        headers={"Retry-After": exc.retry_after_header}
+    )
+
+_audio_gc_task = None
+
+@app.on_event("startup")
+async def startup():
+    # 오래된 음성 파일 주기적 정리
+    global _audio_gc_task
+    _audio_gc_task = asyncio.create_task(run_audio_gc())
+
+@app.on_event("shutdown")
+async def shutdown():
+    if _audio_gc_task is not None:
+        _audio_gc_task.cancel()
+    # 지연 쓰기 대기 중인 대화 내역 저장
+    await get_conversation_writer().close()
+    # 공용 프로바이더 클라이언트 커넥션 풀 정리
+    await close_clients()
+    await close_hume_stream()
+
 @app.get("/")
 def root():
     return {"message": "SENI Agent Builder API", "version": "1.0.0"}
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    # 외부 프로바이더 차단기 상태 (하나라도 열려 있으면 degraded)
+    providers = breaker_states()
+    degraded = any(state["state"] == OPEN for state in providers.values())
+    return {
+        "status": "degraded" if degraded else "healthy",
+        "providers": providers,
+        "caches": {
+            "response": response_cache.stats(),
+            "emotion": emotion_cache.stats(),
+            "tts": tts_cache.stats()
+        },
+        "conversation_writer": get_conversation_writer().stats()
+    }
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -14,8 +14,14 @@ class Agent(Base):
     scenario_flow = Column(JSON)  # 노드와 엣지 정보를 저장
     stt_module = Column(String(50))
     emotion_module = Column(String(50))
+    emotion_deadline_ms = Column(Integer)  # 감정 분석 대기 한도(ms), 없으면 끝날 때까지 대기
     llm_module = Column(String(50))
+    llm_fallbacks = Column(JSON)  # 장애/지연 시 순서대로 시도할 보조 LLM 목록
     tts_module = Column(String(50))
+    response_cache_ttl = Column(Integer)  # 응답 캐시 TTL(초), 없거나 0이면 캐시 사용 안 함
+    greeting = Column(Text)  # 미리 생성된 인사말
+    greeting_audio_url = Column(String(500))
+    greeting_hash = Column(String(64))  # 인사말 생성 입력값 해시
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -31,7 +37,11 @@ class Conversation(Base):
     agent_response = Column(Text, nullable=False)
     emotion = Column(String(50))  # 감정 분석 결과
     emotion_scores = Column(JSON)  # 전체 감정 점수
+    trace = Column(JSON(none_as_null=True))  # 처리 과정 기록 (단계별 시각, 프로바이더 호출, 캐시 적중)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # 관계 설정
-    agent = relationship("Agent", back_populates="conversations")
\ No newline at end of file
+    agent = relationship("Agent", back_populates="conversations")
+    
+    # 에이전트별 기간 조회용
+    __table_args__ = (Index("ix_conversations_agent_id_created_at", "agent_id", "created_at"),)
\ No newline at end of file
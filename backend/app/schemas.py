@@ -1,7 +1,19 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
+# 에이전트 설정에서 사용할 수 있는 LLM 프로바이더
+LLM_PROVIDERS = ("claude", "gpt", "gemini")
+
+def _check_llm_fallbacks(value: Optional[List[str]]) -> Optional[List[str]]:
+    """지원하지 않는 프로바이더는 거부하고 중복은 순서를 유지한 채 제거"""
+    if value is None:
+        return None
+    unknown = [name for name in value if name not in LLM_PROVIDERS]
+    if unknown:
+        raise ValueError(f"Unsupported LLM provider: {', '.join(unknown)} (supported: {', '.join(LLM_PROVIDERS)})")
+    return list(dict.fromkeys(value))
+
 class NodeData(BaseModel):
     id: str
     type: str  # 'start', 'dialog', 'decision', 'action', 'end'
@@ -27,8 +39,13 @@ class AgentBase(BaseModel):
     scenario_flow: Optional[Dict[str, Any]] = None
     stt_module: Optional[str] = None
     emotion_module: Optional[str] = None
+    emotion_deadline_ms: Optional[int] = None
     llm_module: Optional[str] = None
+    llm_fallbacks: Optional[List[str]] = None
     tts_module: Optional[str] = None
+    response_cache_ttl: Optional[int] = None
+
+    _validate_llm_fallbacks = field_validator("llm_fallbacks")(_check_llm_fallbacks)
 
 class AgentCreate(AgentBase):
     pass
@@ -41,8 +58,13 @@ class AgentUpdate(BaseModel):
     scenario_flow: Optional[Dict[str, Any]] = None
     stt_module: Optional[str] = None
     emotion_module: Optional[str] = None
+    emotion_deadline_ms: Optional[int] = None
     llm_module: Optional[str] = None
+    llm_fallbacks: Optional[List[str]] = None
     tts_module: Optional[str] = None
+    response_cache_ttl: Optional[int] = None
+
+    _validate_llm_fallbacks = field_validator("llm_fallbacks")(_check_llm_fallbacks)
 
 class Agent(AgentBase):
     id: int
@@ -52,6 +74,16 @@ class Agent(AgentBase):
     class Config:
         from_attributes = True
 
+class ConversationTrace(BaseModel):
+    id: int
+    user_message: str
+    emotion: Optional[str] = None
+    trace: Dict[str, Any]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
 class ScenarioParseRequest(BaseModel):
     text: str
     agent_id: Optional[int] = None
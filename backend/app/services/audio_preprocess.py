@@ -0,0 +1,197 @@
+import io
+import os
+import wave
+import shutil
+import struct
+import subprocess
+from typing import Optional
+import numpy as np
+
+# STT 전송 전 오디오 전처리
+#
+# 컨테이너/코덱을 매직 바이트로 판별하고, PCM WAV와 (ffmpeg가 있으면) 압축 포맷
+# (브라우저 MediaRecorder의 WebM/Ogg Opus, FLAC, MP3)을 디코딩해서
+# 모노 변환 → 앞뒤 무음 제거(에너지 기반 VAD) → 프로바이더 샘플레이트로 리샘플링 후 16bit WAV로 다시 만든다.
+# 디코딩할 수 없으면 내용은 그대로 두고 올바른 인코딩과 샘플레이트만 알아낸다.
+
+# 프로바이더가 샘플레이트를 지정하지 않을 때의 기본값
+TARGET_SAMPLE_RATE = 16000
+VAD_FRAME_SECONDS = 0.02
+# 이 RMS(0~1) 이하의 프레임은 무음으로 간주 (약 -50 dBFS)
+VAD_MIN_RMS = float(os.getenv("STT_VAD_MIN_RMS", "0.003"))
+# 잘린 말끝이 인식되지 않는 일이 없도록 음성 구간 앞뒤로 남겨 두는 길이(초)
+VAD_PADDING_SECONDS = 0.2
+
+# 압축 포맷 디코더 (없으면 압축 포맷은 전처리하지 않음)
+FFMPEG_PATH = shutil.which(os.getenv("FFMPEG_PATH", "ffmpeg"))
+FFMPEG_TIMEOUT = float(os.getenv("FFMPEG_TIMEOUT", "10"))
+
+# Google이 허용하는 Opus 샘플레이트
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+class PreparedAudio:
+    """전처리된 오디오와 프로바이더에 넘길 형식 정보"""
+
+    def __init__(self, content: bytes, encoding: str, sample_rate: Optional[int], filename: str):
+        self.content = content
+        self.encoding = encoding  # Google RecognitionConfig.AudioEncoding 이름
+        self.sample_rate = sample_rate  # 알 수 없으면 None (프로바이더가 헤더에서 판단)
+        self.filename = filename
+
+def detect_container(data: bytes) -> str:
+    """매직 바이트로 컨테이너 판별 (wav, webm, ogg, flac, mp3, unknown)"""
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return "wav"
+    if data[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if data[:4] == b"OggS":
+        return "ogg"
+    if data[:4] == b"fLaC":
+        return "flac"
+    if data[:3] == b"ID3" or (len(data) > 1 and data[0] == 0xFF and data[1] & 0xE0 == 0xE0):
+        return "mp3"
+    return "unknown"
+
+def prepare_audio(
+    data: bytes,
+    filename: str = "audio.wav",
+    process: bool = True,
+    sample_rate: int = TARGET_SAMPLE_RATE
+) -> PreparedAudio:
+    """STT 요청용 오디오 준비 (process=False면 형식 판별만, sample_rate는 프로바이더 샘플레이트)"""
+    container = detect_container(data)
+    if process and container != "unknown":
+        if container == "wav":
+            processed = _process_wav(data, sample_rate)
+        else:
+            processed = _process_compressed(data, sample_rate)
+        if processed is not None:
+            return PreparedAudio(processed, "LINEAR16", sample_rate, "audio.wav")
+    if container == "wav":
+        return PreparedAudio(data, "LINEAR16", None, "audio.wav")
+    if container == "webm":
+        return PreparedAudio(data, "WEBM_OPUS", _opus_sample_rate(data), "audio.webm")
+    if container == "ogg":
+        return PreparedAudio(data, "OGG_OPUS", _opus_sample_rate(data), "audio.ogg")
+    if container == "flac":
+        return PreparedAudio(data, "FLAC", _flac_sample_rate(data), "audio.flac")
+    if container == "mp3":
+        return PreparedAudio(data, "MP3", None, "audio.mp3")
+    return PreparedAudio(data, "ENCODING_UNSPECIFIED", None, filename)
+
+def _opus_sample_rate(data: bytes) -> int:
+    # OpusHead: 버전(1) 채널(1) pre-skip(2) 원본 샘플레이트(4, LE)
+    index = data.find(b"OpusHead", 0, 4096)
+    if index >= 0 and len(data) >= index + 16:
+        sample_rate = struct.unpack_from("<I", data, index + 12)[0]
+        if sample_rate in OPUS_SAMPLE_RATES:
+            return sample_rate
+    # Opus는 내부적으로 48kHz (브라우저 MediaRecorder 기본값)
+    return 48000
+
+def _flac_sample_rate(data: bytes) -> Optional[int]:
+    # STREAMINFO 블록의 샘플레이트 (20bit)
+    if len(data) < 21:
+        return None
+    return (data[18] << 12 | data[19] << 4 | data[20] >> 4) or None
+
+def _process_wav(data: bytes, target_rate: int) -> Optional[bytes]:
+    """PCM WAV를 모노 16bit target_rate WAV로 변환 (지원하지 않는 WAV면 None)"""
+    try:
+        with wave.open(io.BytesIO(data), "rb") as reader:
+            channels = reader.getnchannels()
+            sample_width = reader.getsampwidth()
+            sample_rate = reader.getframerate()
+            frames = reader.readframes(reader.getnframes())
+    except (wave.Error, EOFError):
+        return None
+
+    samples = _decode_pcm(frames, sample_width)
+    if samples is None or sample_rate <= 0:
+        return None
+    samples = samples[: len(samples) - len(samples) % channels].reshape(-1, channels)
+
+    mono = samples.mean(axis=1)
+    mono = trim_silence(mono, sample_rate)
+    mono = resample(mono, sample_rate, target_rate)
+    return _encode_wav(mono, target_rate)
+
+def _process_compressed(data: bytes, target_rate: int) -> Optional[bytes]:
+    """압축 오디오를 ffmpeg로 모노 target_rate PCM으로 디코딩한 뒤 무음 제거 (디코딩할 수 없으면 None)"""
+    if FFMPEG_PATH is None:
+        return None
+    try:
+        result = subprocess.run(
+            [
+                FFMPEG_PATH, "-nostdin", "-loglevel", "error",
+                "-i", "pipe:0",
+                "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(target_rate),
+                "pipe:1"
+            ],
+            input=data,
+            capture_output=True,
+            timeout=FFMPEG_TIMEOUT,
+            check=True
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"Audio decode failed: {e}")
+        return None
+    if not result.stdout:
+        return None
+    mono = np.frombuffer(result.stdout, dtype="<i2").astype(np.float32) / 32768
+    return _encode_wav(trim_silence(mono, target_rate), target_rate)
+
+def _encode_wav(mono: np.ndarray, sample_rate: int) -> bytes:
+    pcm = (np.clip(mono, -1.0, 1.0) * 32767).astype("<i2")
+    output = io.BytesIO()
+    with wave.open(output, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        writer.writeframes(pcm.tobytes())
+    return output.getvalue()
+
+def _decode_pcm(frames: bytes, sample_width: int) -> Optional[np.ndarray]:
+    """PCM 바이트를 -1~1 float32 배열로 변환"""
+    if sample_width == 1:
+        return (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    if sample_width == 2:
+        return np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768
+    if sample_width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        values = raw[:, 0].astype(np.int32) | raw[:, 1].astype(np.int32) << 8 | raw[:, 2].astype(np.int32) << 16
+        values = np.where(values >= 1 << 23, values - (1 << 24), values)
+        return values.astype(np.float32) / (1 << 23)
+    if sample_width == 4:
+        return np.frombuffer(frames, dtype="<i4").astype(np.float32) / (1 << 31)
+    return None
+
+def trim_silence(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """프레임 RMS 기준으로 앞뒤 무음 제거 (음성이 없으면 그대로 반환)"""
+    frame = max(1, int(sample_rate * VAD_FRAME_SECONDS))
+    count = len(samples) // frame
+    if count == 0:
+        return samples
+    rms = np.sqrt(np.mean(samples[: count * frame].reshape(count, frame) ** 2, axis=1))
+    # 배경 소음이 큰 녹음에서도 동작하도록 하위 10% 프레임 에너지의 3배를 기준으로 사용
+    threshold = max(VAD_MIN_RMS, float(np.percentile(rms, 10)) * 3)
+    voiced = np.flatnonzero(rms > threshold)
+    if len(voiced) == 0:
+        return samples
+    padding = int(VAD_PADDING_SECONDS * sample_rate)
+    start = max(0, voiced[0] * frame - padding)
+    end = min(len(samples), (voiced[-1] + 1) * frame + padding)
+    return samples[start:end]
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """FFT 기반 리샘플링 (다운샘플링 시 나이퀴스트 이상 대역은 제거됨)"""
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+    target_length = max(1, int(round(len(samples) * target_rate / source_rate)))
+    spectrum = np.fft.rfft(samples)
+    bins = target_length // 2 + 1
+    if len(spectrum) >= bins:
+        spectrum = spectrum[:bins]
+    else:
+        spectrum = np.concatenate([spectrum, np.zeros(bins - len(spectrum), dtype=spectrum.dtype)])
+    return np.fft.irfft(spectrum, n=target_length).astype(np.float32) * (target_length / len(samples))
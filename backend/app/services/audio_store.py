@@ -0,0 +1,159 @@
+import os
+import re
+import time
+import asyncio
+from typing import Optional, Dict, Any
+
+# 저장소가 만드는 파일 이름 (경로 구분자나 ..이 들어갈 수 없음)
+_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,254}$")
+
+class LocalAudioStore:
+    """로컬 파일시스템 음성 파일 저장소
+
+    파일은 임시 파일에 쓴 뒤 이름을 바꿔서 원자적으로 저장하고,
+    collect()가 max_age초보다 오래 사용되지 않은 파일과 전체 크기가 max_bytes를 넘는
+    만큼의 오래된 파일을 삭제한다. 사용 시각은 touch()로 갱신한다(mtime 기준).
+    """
+
+    def __init__(self, root: str, public_base_url: str, max_bytes: int = 1024 * 1024 * 1024, max_age: float = 7 * 86400):
+        self.root = root
+        self.public_base_url = public_base_url.rstrip("/")
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.collected_files = 0
+        self._approx_bytes = 0
+        self._collecting: Optional[asyncio.Task] = None
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def valid_name(name: str) -> bool:
+        return bool(_NAME.match(name)) and ".." not in name
+
+    def path(self, name: str) -> str:
+        if not self.valid_name(name):
+            raise ValueError(f"Invalid audio name: {name}")
+        return os.path.join(self.root, name)
+
+    def url(self, name: str) -> str:
+        return f"{self.public_base_url}/api/audio/{name}"
+
+    def name_from_url(self, url: str) -> Optional[str]:
+        """이 저장소의 공개 URL이면 파일 이름, 아니면 None (이전 /static/audio URL 포함)"""
+        for prefix in (f"{self.public_base_url}/api/audio/", f"{self.public_base_url}/static/audio/"):
+            if url.startswith(prefix):
+                name = url[len(prefix):]
+                return name if self.valid_name(name) else None
+        return None
+
+    def exists(self, name: str) -> bool:
+        return os.path.isfile(self.path(name))
+
+    def touch(self, name: str):
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            pass
+
+    async def put(self, name: str, data: bytes) -> str:
+        """파일을 원자적으로 저장하고 공개 URL 반환"""
+        path = self.path(name)
+        await asyncio.get_running_loop().run_in_executor(None, _write_atomic, path, data)
+        self._approx_bytes += len(data)
+        # 크기 한도를 넘으면 주기 작업을 기다리지 않고 바로 정리
+        if self._approx_bytes > self.max_bytes and (self._collecting is None or self._collecting.done()):
+            self._collecting = asyncio.create_task(self.collect())
+        return self.url(name)
+
+    async def delete(self, name: str):
+        try:
+            os.unlink(self.path(name))
+        except FileNotFoundError:
+            pass
+
+    async def collect(self) -> int:
+        """오래된 파일/크기 초과분 삭제 (삭제한 파일 수 반환)"""
+        removed, total = await asyncio.get_running_loop().run_in_executor(None, self._collect)
+        self._approx_bytes = total
+        self.collected_files += removed
+        return removed
+
+    def _collect(self) -> tuple:
+        now = time.time()
+        removed = 0
+        files = []
+        for entry in os.scandir(self.root):
+            if not entry.is_file():
+                continue
+            stat = entry.stat()
+            if entry.name.endswith(".tmp"):
+                # 쓰다가 중단된 임시 파일 (쓰는 중일 수 있으므로 충분히 지난 것만)
+                if now - stat.st_mtime > 3600:
+                    removed += _unlink(entry.path)
+                continue
+            files.append((stat.st_mtime, entry.path, stat.st_size))
+
+        total = 0
+        kept = []
+        for mtime, path, size in files:
+            if now - mtime > self.max_age:
+                removed += _unlink(path)
+            else:
+                kept.append((mtime, path, size))
+                total += size
+
+        # 최근에 사용되지 않은 파일부터 크기 한도까지 삭제
+        kept.sort()
+        for mtime, path, size in kept:
+            if total <= self.max_bytes:
+                break
+            removed += _unlink(path)
+            total -= size
+        return removed, total
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "bytes": self._approx_bytes,
+            "collected_files": self.collected_files
+        }
+
+def _write_atomic(path: str, data: bytes):
+    # 다른 요청이 쓰는 도중의 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = f"{path}.{os.getpid()}.{id(data)}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def _unlink(path: str) -> int:
+    try:
+        os.unlink(path)
+        return 1
+    except FileNotFoundError:
+        return 0
+
+AUDIO_GC_INTERVAL = float(os.getenv("AUDIO_GC_INTERVAL", "600"))
+
+_store: Optional[LocalAudioStore] = None
+
+def get_audio_store() -> LocalAudioStore:
+    """공용 음성 파일 저장소 (AUDIO_STORE_* 환경변수로 설정)"""
+    global _store
+    if _store is None:
+        _store = LocalAudioStore(
+            root=os.getenv("AUDIO_STORE_ROOT", "/tmp/static/audio"),
+            public_base_url=os.getenv("PUBLIC_BASE_URL", "http://localhost:8000"),
+            max_bytes=int(os.getenv("AUDIO_STORE_MAX_BYTES", str(1024 * 1024 * 1024))),
+            max_age=float(os.getenv("AUDIO_STORE_MAX_AGE", str(7 * 86400)))
+        )
+    return _store
+
+async def run_audio_gc():
+    """주기적으로 저장소 정리 (애플리케이션 시작 시 백그라운드로 실행)"""
+    store = get_audio_store()
+    while True:
+        try:
+            removed = await store.collect()
+            if removed:
+                print(f"Audio store GC removed {removed} files")
+        except Exception as e:
+            print(f"Audio store GC error: {e}")
+        await asyncio.sleep(AUDIO_GC_INTERVAL)
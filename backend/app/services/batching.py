@@ -0,0 +1,63 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Set
+
+class MicroBatcher:
+    """동시에 들어온 요청을 짧은 시간 동안 모아 한 번에 처리
+
+    첫 요청 후 window초가 지나거나 max_batch개가 모이면 run_batch(items)를
+    한 번 호출하고, 결과 리스트를 입력 순서대로 각 호출자에게 돌려준다.
+    run_batch가 실패하면 같은 배치의 모든 호출자에게 예외가 전달된다.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        window: float = 0.02,
+        max_batch: int = 50
+    ):
+        self.run_batch = run_batch
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.items = 0
+        self._pending: List[tuple] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # 실행 중인 배치 작업 (참조가 없으면 실행 도중 GC될 수 있음)
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[tuple]):
+        items = [item for item, _ in batch]
+        self.batches += 1
+        self.items += len(items)
+        try:
+            results = await self.run_batch(items)
+            if len(results) != len(items):
+                raise RuntimeError(f"Batch returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            # 대기 중에 취소된 호출자는 건너뜀
+            if not future.done():
+                future.set_result(result)
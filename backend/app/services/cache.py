@@ -0,0 +1,158 @@
+import os
+import re
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_text(text: Optional[str]) -> str:
+    """캐시 키용 정규화 (공백 축약, 대소문자 무시)"""
+    if not text:
+        return ""
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+class MemoryCacheBackend:
+    """프로세스 내 LRU 캐시 (바이트 크기 기준 제거 + 항목별 TTL)"""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, max_entries: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.current_bytes = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple[Any, int, Optional[float]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, size, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, size: Optional[int] = None):
+        if size is None:
+            size = len(key) + len(str(value).encode())
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._entries[key] = (value, size, expires_at)
+        self.current_bytes += size
+        # 용량/개수 한도를 넘으면 가장 오래 사용되지 않은 항목부터 제거
+        while self._entries and (
+            self.current_bytes > self.max_bytes
+            or (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    async def delete(self, key: str):
+        if key in self._entries:
+            self._remove(key)
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+class SharedCacheBackend:
+    """여러 워커가 공유하는 캐시 (Redis 호환 비동기 클라이언트)
+
+    get(key)/set(key, value, ex=ttl)/delete(key)를 제공하는 객체라면
+    무엇이든 client로 사용할 수 있다.
+    """
+
+    def __init__(self, client, prefix: str = "seni:cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.client.get(self.prefix + key)
+        if isinstance(value, bytes):
+            value = value.decode()
+        return value
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None, size: Optional[int] = None):
+        await self.client.set(self.prefix + key, value, ex=int(ttl) if ttl else None)
+
+    async def delete(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+class ResponseCache:
+    """LLM 응답 캐시 (system_prompt, emotion, message, provider 기준)"""
+
+    def __init__(self, backend, default_ttl: Optional[float] = None):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(*parts: Optional[str]) -> str:
+        normalized = "\x1f".join(normalize_text(part) for part in parts)
+        return hashlib.sha256(normalized.encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            print(f"Response cache get error: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None):
+        if ttl is None:
+            ttl = self.default_ttl
+        try:
+            await self.backend.set(key, value, ttl=ttl)
+        except Exception as e:
+            print(f"Response cache set error: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        stats = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0
+        }
+        if isinstance(self.backend, MemoryCacheBackend):
+            stats.update({
+                "entries": len(self.backend),
+                "bytes": self.backend.current_bytes,
+                "evictions": self.backend.evictions
+            })
+        return stats
+
+def _create_response_cache() -> ResponseCache:
+    backend_type = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+    default_ttl = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+
+    if backend_type == "redis":
+        redis_url = os.getenv("RESPONSE_CACHE_REDIS_URL", "redis://localhost:6379/0")
+        if aioredis is None:
+            print("redis package not installed, falling back to in-memory response cache")
+        else:
+            return ResponseCache(SharedCacheBackend(aioredis.from_url(redis_url)), default_ttl)
+
+    max_bytes = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    return ResponseCache(MemoryCacheBackend(max_bytes=max_bytes), default_ttl)
+
+response_cache = _create_response_cache()
@@ -0,0 +1,178 @@
+import os
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+from app.services.rate_limit import ProviderOverloaded
+from app.services import metrics, tracing
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(ProviderOverloaded):
+    """차단기가 열려 있어 호출하지 않고 즉시 실패 (503)"""
+    status_code = 503
+
+class CircuitBreaker:
+    """프로바이더별 차단기 (최근 구간의 오류율/지연 기준)
+
+    window초 동안 min_calls 이상 호출되었고 오류율이 error_rate 이상이거나
+    slow_call_seconds를 넘긴 호출 비율이 slow_call_rate 이상이면 열린다.
+    open_seconds가 지나면 half-open 상태에서 제한된 수의 시험 호출을 허용하고,
+    시험 호출이 성공하면 닫히고 실패하면 다시 열린다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: float = 30.0,
+        min_calls: int = 10,
+        error_rate: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        slow_call_rate: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self.rejected = 0
+        self._calls: deque = deque()  # (완료 시각, 성공 여부, 소요 시간)
+
+    def _blocked_for(self) -> Optional[float]:
+        """호출이 막혀 있으면 남은 시간(초), 호출 가능하면 None"""
+        if self.state == OPEN:
+            remaining = self.opened_at + self.open_seconds - time.monotonic()
+            if remaining > 0:
+                return remaining
+            self.state = HALF_OPEN
+            self.half_open_calls = 0
+        if self.state == HALF_OPEN and self.half_open_calls >= self.half_open_max_calls:
+            return 1.0
+        return None
+
+    @property
+    def available(self) -> bool:
+        return self._blocked_for() is None
+
+    def check(self):
+        """호출 가능 여부 확인 (불가능하면 CircuitOpenError)"""
+        blocked_for = self._blocked_for()
+        if blocked_for is not None:
+            self.rejected += 1
+            raise CircuitOpenError(self.name, blocked_for, f"circuit {self.state}")
+
+    @asynccontextmanager
+    async def call(self):
+        self.check()
+        probe = self.state == HALF_OPEN
+        if probe:
+            self.half_open_calls += 1
+        started = time.monotonic()
+        trace_call = tracing.begin_call(self.name)
+        try:
+            yield
+        except (asyncio.CancelledError, GeneratorExit):
+            # 헤지 취소나 스트림 중단은 성공/실패로 집계하지 않음
+            if probe:
+                self.half_open_calls -= 1
+            tracing.end_call(trace_call, "cancelled")
+            raise
+        except Exception:
+            elapsed = time.monotonic() - started
+            self._record(False, elapsed, probe)
+            metrics.provider_seconds.observe(elapsed, provider=self.name)
+            metrics.provider_errors.inc(provider=self.name)
+            tracing.end_call(trace_call, "error")
+            raise
+        else:
+            elapsed = time.monotonic() - started
+            self._record(True, elapsed, probe)
+            metrics.provider_seconds.observe(elapsed, provider=self.name)
+            tracing.end_call(trace_call, "ok")
+
+    def _record(self, ok: bool, elapsed: float, probe: bool):
+        now = time.monotonic()
+        if probe:
+            self.half_open_calls -= 1
+            if ok and elapsed < self.slow_call_seconds:
+                self._close()
+            else:
+                self._open(now)
+            return
+
+        self._calls.append((now, ok, elapsed))
+        self._trim(now)
+        if self.state == CLOSED and len(self._calls) >= self.min_calls:
+            failures = sum(1 for _, call_ok, _ in self._calls if not call_ok)
+            slow = sum(1 for _, _, took in self._calls if took >= self.slow_call_seconds)
+            if (failures / len(self._calls) >= self.error_rate
+                    or slow / len(self._calls) >= self.slow_call_rate):
+                self._open(now)
+
+    def _trim(self, now: float):
+        while self._calls and self._calls[0][0] < now - self.window:
+            self._calls.popleft()
+
+    def _open(self, now: float):
+        if self.state != OPEN:
+            print(f"Circuit breaker opened: {self.name}")
+        self.state = OPEN
+        self.opened_at = now
+        self._calls.clear()
+
+    def _close(self):
+        print(f"Circuit breaker closed: {self.name}")
+        self.state = CLOSED
+        self._calls.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._trim(time.monotonic())
+        calls = len(self._calls)
+        failures = sum(1 for _, ok, _ in self._calls if not ok)
+        latencies = sorted(took for _, _, took in self._calls)
+        return {
+            "state": self.state,
+            "calls": calls,
+            "error_rate": failures / calls if calls else 0.0,
+            "p95_latency": latencies[int(0.95 * (calls - 1))] if calls else None,
+            "rejected": self.rejected
+        }
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+def _setting(name: str, key: str, default: str) -> float:
+    # BREAKER_<NAME>_<KEY>가 있으면 우선 사용, 없으면 BREAKER_<KEY>
+    return float(os.getenv(f"BREAKER_{name.upper()}_{key}", os.getenv(f"BREAKER_{key}", default)))
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """프로바이더 이름별 공용 차단기"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            name,
+            window=_setting(name, "WINDOW", "30"),
+            min_calls=int(_setting(name, "MIN_CALLS", "10")),
+            error_rate=_setting(name, "ERROR_RATE", "0.5"),
+            slow_call_seconds=_setting(name, "SLOW_CALL_SECONDS", "10"),
+            slow_call_rate=_setting(name, "SLOW_CALL_RATE", "0.8"),
+            open_seconds=_setting(name, "OPEN_SECONDS", "30")
+        )
+        _breakers[name] = breaker
+    return breaker
+
+def all_breakers() -> Dict[str, CircuitBreaker]:
+    return dict(sorted(_breakers.items()))
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    return {name: breaker.snapshot() for name, breaker in all_breakers().items()}
@@ -0,0 +1,134 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, TYPE_CHECKING
+import httpx
+import openai
+import anthropic
+import google.generativeai as genai
+
+if TYPE_CHECKING:
+    # STT SDK(특히 Azure 네이티브 라이브러리)를 불러올 수 없는 환경에서도
+    # LLM 등 다른 클라이언트는 사용할 수 있도록 실제 import는 getter 안에서 수행
+    import azure.cognitiveservices.speech as speechsdk
+    from google.cloud import speech
+
+# 프로바이더별 클라이언트는 프로세스 전체에서 하나만 생성하여
+# keep-alive HTTP 커넥션 풀을 요청 간에 재사용한다.
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+GEMINI_MODEL = "gemini-2.0-flash-exp"
+# 비동기 API가 없는 SDK(Azure Speech) 호출을 실행하는 스레드 수
+STT_MAX_WORKERS = int(os.getenv("STT_MAX_WORKERS", "8"))
+
+_anthropic_client: Optional[anthropic.AsyncAnthropic] = None
+_openai_client: Optional[openai.AsyncOpenAI] = None
+_gemini_model: Optional[genai.GenerativeModel] = None
+_hume_client: Optional[httpx.AsyncClient] = None
+_google_speech_client: Optional["speech.SpeechAsyncClient"] = None
+_azure_speech_config: Optional["speechsdk.SpeechConfig"] = None
+_stt_executor: Optional[ThreadPoolExecutor] = None
+
+def get_anthropic_client() -> anthropic.AsyncAnthropic:
+    """Anthropic 비동기 클라이언트 (공용)"""
+    global _anthropic_client
+    if _anthropic_client is None:
+        api_key = os.getenv("ANTHROPIC_API_KEY")
+        if not api_key:
+            raise ValueError("Anthropic API key not found")
+        _anthropic_client = anthropic.AsyncAnthropic(
+            api_key=api_key,
+            timeout=LLM_TIMEOUT,
+            max_retries=LLM_MAX_RETRIES
+        )
+    return _anthropic_client
+
+def get_openai_client() -> openai.AsyncOpenAI:
+    """OpenAI 비동기 클라이언트 (공용)"""
+    global _openai_client
+    if _openai_client is None:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OpenAI API key not found")
+        _openai_client = openai.AsyncOpenAI(
+            api_key=api_key,
+            timeout=LLM_TIMEOUT,
+            max_retries=LLM_MAX_RETRIES
+        )
+    return _openai_client
+
+def get_gemini_model() -> genai.GenerativeModel:
+    """Gemini 모델 (genai.configure는 최초 1회만 호출)"""
+    global _gemini_model
+    if _gemini_model is None:
+        api_key = os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            raise ValueError("Google API key not found")
+        genai.configure(api_key=api_key)
+        _gemini_model = genai.GenerativeModel(GEMINI_MODEL)
+    return _gemini_model
+
+def get_hume_client() -> httpx.AsyncClient:
+    """Hume API 공용 HTTP 클라이언트 (TLS 핸드셰이크를 요청마다 반복하지 않음)"""
+    global _hume_client
+    if _hume_client is None:
+        _hume_client = httpx.AsyncClient(
+            base_url="https://api.hume.ai",
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60.0)
+        )
+    return _hume_client
+
+def get_google_speech_client() -> "speech.SpeechAsyncClient":
+    """Google Cloud Speech 비동기(gRPC) 클라이언트 (공용 채널 재사용)"""
+    global _google_speech_client
+    if _google_speech_client is None:
+        from google.cloud import speech
+
+        credentials_path = os.getenv("GOOGLE_CLOUD_CREDENTIALS")
+        if not credentials_path:
+            raise ValueError("Google Cloud credentials not found")
+        _google_speech_client = speech.SpeechAsyncClient.from_service_account_file(credentials_path)
+    return _google_speech_client
+
+def get_azure_speech_config() -> "speechsdk.SpeechConfig":
+    """Azure Speech 설정 (인식기는 오디오마다 만들지만 설정은 재사용)"""
+    global _azure_speech_config
+    if _azure_speech_config is None:
+        import azure.cognitiveservices.speech as speechsdk
+
+        speech_key = os.getenv("AZURE_SPEECH_KEY")
+        speech_region = os.getenv("AZURE_SPEECH_REGION")
+        if not speech_key or not speech_region:
+            raise ValueError("Azure Speech credentials not found")
+        _azure_speech_config = speechsdk.SpeechConfig(subscription=speech_key, region=speech_region)
+        _azure_speech_config.speech_recognition_language = "ko-KR"
+    return _azure_speech_config
+
+def get_stt_executor() -> ThreadPoolExecutor:
+    """블로킹 STT SDK 호출용 스레드 풀 (이벤트 루프를 막지 않도록 크기 제한)"""
+    global _stt_executor
+    if _stt_executor is None:
+        _stt_executor = ThreadPoolExecutor(max_workers=STT_MAX_WORKERS, thread_name_prefix="stt")
+    return _stt_executor
+
+async def close_clients():
+    """애플리케이션 종료 시 커넥션 풀 정리"""
+    global _anthropic_client, _openai_client, _gemini_model, _hume_client
+    global _google_speech_client, _azure_speech_config, _stt_executor
+    if _anthropic_client is not None:
+        await _anthropic_client.close()
+        _anthropic_client = None
+    if _openai_client is not None:
+        await _openai_client.close()
+        _openai_client = None
+    _gemini_model = None
+    if _hume_client is not None:
+        await _hume_client.aclose()
+        _hume_client = None
+    if _google_speech_client is not None:
+        await _google_speech_client.transport.close()
+        _google_speech_client = None
+    _azure_speech_config = None
+    if _stt_executor is not None:
+        _stt_executor.shutdown(wait=False, cancel_futures=True)
+        _stt_executor = None
@@ -0,0 +1,244 @@
+import os
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import insert
+from app import models
+from app.database import SessionLocal
+
+QUEUED = "queued"
+WRITING = "writing"
+WRITTEN = "written"
+FAILED = "failed"
+
+class PendingConversation:
+    """쓰기 대기 중인 대화 (DB에 저장된 뒤 id 확정)"""
+
+    def __init__(self, values: Dict[str, Any], durable: bool):
+        self.values = values
+        self.durable = durable
+        self.state = QUEUED
+        self.id: Optional[int] = None
+        self.patch: Dict[str, Any] = {}  # 저장 중/후에 들어온 변경 (UPDATE로 반영)
+        self.patch_queued = False
+        self._saved = asyncio.get_running_loop().create_future()
+
+    async def wait(self) -> int:
+        """저장될 때까지 기다려서 id 반환 (저장에 실패하면 예외)"""
+        return await asyncio.shield(self._saved)
+
+    def _resolve(self, conversation_id: Optional[int], error: Optional[Exception] = None):
+        if error is not None:
+            self.state = FAILED
+            if not self._saved.done():
+                self._saved.set_exception(error)
+                # 기다리는 쪽이 없어도 "never retrieved" 경고가 남지 않도록 처리
+                self._saved.exception()
+            return
+        self.state = WRITTEN
+        self.id = conversation_id
+        if not self._saved.done():
+            self._saved.set_result(conversation_id)
+
+class ConversationWriter:
+    """대화 내역 지연 쓰기 (write-behind)
+
+    add()로 들어온 대화를 대기열에 모았다가 max_batch개가 모이거나 첫 항목 후
+    flush_interval초가 지나면 한 번의 multi-row INSERT와 한 번의 커밋으로 저장한다.
+    대기열은 max_pending개로 제한되어 가득 차면 add()가 자리가 날 때까지 기다린다.
+    durable=True인 대화는 기다리지 않고 바로 저장을 시작하며 add()가 커밋 후에 반환한다.
+    저장 전에 들어온 변경(늦은 감정 분석, 처리 과정 기록)은 INSERT에 합치고,
+    저장 후에 들어온 변경은 다음 배치에서 UPDATE로 반영한다.
+    """
+
+    def __init__(self, max_batch: int = 100, flush_interval: float = 0.05, max_pending: int = 1000):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._max_pending = max_pending
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # 대기열이 가득 찼을 때 들어온 변경 (다음 배치에 합침)
+        self._overflow: List[PendingConversation] = []
+        self.rows = 0
+        self.updates = 0
+        self.batches = 0
+        self.failed = 0
+
+    def _ensure_running(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self._max_pending)
+            self._overflow = []
+            self._task = None
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._queue
+
+    async def add(self, values: Dict[str, Any], durable: bool = False) -> PendingConversation:
+        """대화를 저장 대기열에 추가 (durable이면 커밋될 때까지 대기)"""
+        values.setdefault("created_at", datetime.now(timezone.utc))
+        pending = PendingConversation(values, durable)
+        await self._ensure_running().put(pending)
+        if durable:
+            await pending.wait()
+        return pending
+
+    def update(self, pending: PendingConversation, **fields: Any):
+        """대화 내용 변경 (아직 저장 전이면 INSERT에 합침)"""
+        if pending.state == QUEUED:
+            pending.values.update(fields)
+            return
+        if pending.state == FAILED:
+            return
+        pending.patch.update(fields)
+        if pending.state == WRITTEN:
+            self._queue_patch(pending)
+
+    def _queue_patch(self, pending: PendingConversation):
+        if pending.patch_queued:
+            return
+        pending.patch_queued = True
+        queue = self._ensure_running()
+        try:
+            queue.put_nowait(pending)
+        except asyncio.QueueFull:
+            # 대기열이 가득 차 있으면 곧 처리될 배치에 합침 (한도 밖에서 대기 작업을 만들지 않음)
+            self._overflow.append(pending)
+
+    async def _run(self):
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch and not any(item.durable and item.state == QUEUED for item in batch):
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # 기다리는 동안 더 들어온 항목도 함께 저장
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            received = len(batch)
+            batch.extend(self._overflow)
+            self._overflow = []
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                print(f"Conversation write error: {e}")
+            finally:
+                for _ in range(received):
+                    queue.task_done()
+
+    async def _flush(self, batch: List[PendingConversation]):
+        inserts = [item for item in batch if item.state == QUEUED]
+        updates: List[Tuple[int, Dict[str, Any]]] = []
+        for item in batch:
+            if item.state == WRITTEN and item.patch_queued:
+                updates.append((item.id, item.patch))
+                item.patch, item.patch_queued = {}, False
+        for item in inserts:
+            item.state = WRITING
+
+        loop = asyncio.get_running_loop()
+        try:
+            ids = await loop.run_in_executor(None, _write, [item.values for item in inserts], updates)
+        except Exception as e:
+            print(f"Conversation batch write failed, retrying rows one by one: {e}")
+            await self._flush_each(inserts, updates)
+            return
+        self.batches += 1
+        self.rows += len(inserts)
+        self.updates += len(updates)
+        for item, conversation_id in zip(inserts, ids):
+            self._written(item, conversation_id)
+
+    async def _flush_each(self, inserts: List[PendingConversation], updates: List[Tuple[int, Dict[str, Any]]]):
+        # 한 행의 오류로 배치 전체를 잃지 않도록 개별 저장
+        loop = asyncio.get_running_loop()
+        for item in inserts:
+            try:
+                ids = await loop.run_in_executor(None, _write, [item.values], [])
+            except Exception as e:
+                self.failed += 1
+                print(f"Conversation write failed: {e}")
+                item._resolve(None, e)
+                continue
+            self.batches += 1
+            self.rows += 1
+            self._written(item, ids[0])
+        for update in updates:
+            try:
+                await loop.run_in_executor(None, _write, [], [update])
+                self.batches += 1
+                self.updates += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"Conversation update failed: {e}")
+
+    def _written(self, item: PendingConversation, conversation_id: int):
+        item._resolve(conversation_id)
+        # 저장 중에 들어온 변경은 다음 배치에서 반영
+        if item.patch:
+            self._queue_patch(item)
+
+    async def close(self):
+        """대기 중인 대화를 모두 저장하고 쓰기 작업 종료 (애플리케이션 종료 시)"""
+        if self._queue is not None and self._task is not None and not self._task.done():
+            await self._queue.join()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": (self._queue.qsize() if self._queue is not None else 0) + len(self._overflow),
+            "rows": self.rows,
+            "updates": self.updates,
+            "batches": self.batches,
+            "failed": self.failed
+        }
+
+def _write(rows: List[Dict[str, Any]], updates: List[Tuple[int, Dict[str, Any]]]) -> List[int]:
+    """multi-row INSERT와 UPDATE를 한 트랜잭션으로 저장하고 INSERT한 id를 입력 순서대로 반환"""
+    db = SessionLocal()
+    try:
+        ids: List[int] = []
+        if rows:
+            # 모든 행이 같은 열을 갖도록 맞춰서 하나의 INSERT 문으로 저장
+            columns = set().union(*rows)
+            rows = [{column: row.get(column) for column in columns} for row in rows]
+            result = db.execute(
+                insert(models.Conversation).returning(models.Conversation.id, sort_by_parameter_order=True),
+                rows
+            )
+            ids = list(result.scalars())
+        for conversation_id, fields in updates:
+            (db.query(models.Conversation)
+                .filter(models.Conversation.id == conversation_id)
+                .update(fields, synchronize_session=False))
+        db.commit()
+        return ids
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+_writer: Optional[ConversationWriter] = None
+
+def get_conversation_writer() -> ConversationWriter:
+    """공용 대화 내역 쓰기 작업 (CONVERSATION_WRITE_* 환경변수로 설정)"""
+    global _writer
+    if _writer is None:
+        _writer = ConversationWriter(
+            max_batch=int(os.getenv("CONVERSATION_WRITE_BATCH", "100")),
+            flush_interval=float(os.getenv("CONVERSATION_WRITE_INTERVAL", "0.05")),
+            max_pending=int(os.getenv("CONVERSATION_WRITE_MAX_PENDING", "1000"))
+        )
+    return _writer
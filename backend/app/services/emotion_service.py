@@ -1,8 +1,159 @@
 import os
-import httpx
-from typing import Optional, Dict, Any
+import time
+import asyncio
+from typing import Optional, Dict, Any, List
 import json
 import base64
+from app.services.clients import get_hume_client
+from app.services.hume_stream import get_hume_stream, HumeStreamUnavailable
+from app.services.batching import MicroBatcher
+from app.services.singleflight import SingleFlight
+from app.services.cache import ResponseCache, MemoryCacheBackend
+from app.services.rate_limit import get_limiter, ProviderOverloaded
+from app.services.circuit_breaker import get_breaker
+from app.services import local_emotion
+from app.services import tracing
+
+# stream: 지속 WebSocket 연결로 실시간 분석 (실패 시 batch로 fallback), batch: Batch Job API
+HUME_MODE = os.getenv("HUME_MODE", "stream")
+# batch 결과 폴링: 짧은 간격에서 시작해 점점 늘림
+HUME_POLL_INITIAL = 0.1
+HUME_POLL_MAX = 1.0
+HUME_POLL_FACTOR = 1.5
+HUME_BATCH_TIMEOUT = float(os.getenv("HUME_BATCH_TIMEOUT", "10"))
+# Hume 감정 이름 → 한국어 감정 매핑
+EMOTION_LABELS_KO = {
+    "Joy": "기쁨",
+    "Sadness": "슬픔",
+    "Anger": "분노",
+    "Fear": "두려움",
+    "Surprise": "놀람",
+    "Disgust": "혐오",
+    "Contempt": "경멸",
+    "Shame": "수치심",
+    "Guilt": "죄책감",
+    "Pride": "자부심",
+    "Embarrassment": "당황",
+    "Amusement": "즐거움",
+    "Interest": "관심",
+    "Calmness": "평온",
+    "Calm": "평온",
+    "Confusion": "혼란",
+    "Disappointment": "실망",
+    "Love": "사랑",
+    "Admiration": "감탄",
+    "Sympathy": "동정",
+    "Satisfaction": "만족",
+    "Excitement": "흥분",
+    "Awe": "경외",
+    "Boredom": "지루함",
+    "Concentration": "집중",
+    "Determination": "결단",
+    "Relief": "안도"
+}
+
+# batch 모드에서 동시 요청을 모아 하나의 Job으로 제출
+HUME_BATCH_WINDOW = float(os.getenv("HUME_BATCH_WINDOW", "0.02"))
+HUME_BATCH_MAX_SIZE = int(os.getenv("HUME_BATCH_MAX_SIZE", "50"))
+# 스트리밍 연결/핸드셰이크 실패 후 이 시간(초) 동안은 바로 batch 사용
+HUME_STREAM_RETRY_AFTER = 30.0
+_hume_stream_retry_at = 0.0
+
+# 동일 텍스트에 대한 동시 감정 분석 요청은 한 번만 호출
+_inflight = SingleFlight()
+
+# "네", "감사합니다" 같은 짧은 발화가 많으므로 (모듈, 정규화된 텍스트)별 결과를 캐시
+EMOTION_CACHE_MAX_ENTRIES = int(os.getenv("EMOTION_CACHE_MAX_ENTRIES", "10000"))
+EMOTION_CACHE_TTL = float(os.getenv("EMOTION_CACHE_TTL", "86400"))
+emotion_cache = ResponseCache(
+    MemoryCacheBackend(max_bytes=16 * 1024 * 1024, max_entries=EMOTION_CACHE_MAX_ENTRIES),
+    default_ttl=EMOTION_CACHE_TTL or None
+)
+
+# 만료 전 갱신 구간이 토큰 수명에서 차지할 수 있는 최대 비율
+TOKEN_REFRESH_FRACTION = 0.2
+
+class HumeTokenCache:
+    """Hume 액세스 토큰 캐시
+    
+    expires_in을 기준으로 만료 refresh_margin초 전부터는 현재 토큰을 계속 사용하면서
+    백그라운드에서 미리 갱신한다. expires_in이 짧으면 margin을 그 일부로 줄여서
+    발급 직후부터 매 요청이 갱신을 시작하지 않도록 한다. 발급 요청은 lock으로 한 번만 보낸다.
+    """
+    
+    def __init__(self, refresh_margin: float = 60.0, failure_backoff: float = 30.0):
+        self.refresh_margin = refresh_margin
+        self.failure_backoff = failure_backoff
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._retry_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+    
+    async def get_token(self, api_key: str, secret_key: str) -> Optional[str]:
+        now = time.monotonic()
+        if self._token and now < self._expires_at:
+            # 만료가 가까우면 요청은 기다리게 하지 않고 백그라운드에서 갱신
+            if now >= self._refresh_at and now >= self._retry_at and (
+                self._refresh_task is None or self._refresh_task.done()
+            ):
+                self._refresh_task = asyncio.create_task(self._refresh(api_key, secret_key))
+            return self._token
+        
+        if now < self._retry_at:
+            # 최근 발급 실패: 잠시 API Key 방식으로 사용
+            return None
+        return await self._refresh(api_key, secret_key)
+    
+    def invalidate(self):
+        self._token = None
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+    
+    def _backoff(self, now: float):
+        # 발급 실패 후 failure_backoff 동안은 미리 갱신도 다시 시도하지 않음
+        self._retry_at = now + self.failure_backoff
+        self._refresh_at = max(self._refresh_at, self._retry_at)
+    
+    async def _refresh(self, api_key: str, secret_key: str) -> Optional[str]:
+        async with self._lock:
+            now = time.monotonic()
+            # 다른 요청이 이미 갱신한 경우
+            if self._token and now < self._refresh_at:
+                return self._token
+            
+            # Basic Auth를 사용한 토큰 요청
+            auth_string = f"{api_key}:{secret_key}"
+            auth_header = base64.b64encode(auth_string.encode()).decode()
+            try:
+                token_response = await get_hume_client().post(
+                    "/v0/auth/token",
+                    headers={
+                        "Authorization": f"Basic {auth_header}",
+                        "Content-Type": "application/x-www-form-urlencoded"
+                    },
+                    data={"grant_type": "client_credentials"}
+                )
+            except Exception as e:
+                print(f"Failed to get Hume access token: {e}")
+                self._backoff(now)
+                return self._token if now < self._expires_at else None
+            
+            if token_response.status_code != 200:
+                print(f"Failed to get Hume access token: {token_response.status_code}, {token_response.text}")
+                self._backoff(now)
+                return self._token if now < self._expires_at else None
+            
+            token_data = token_response.json()
+            self._token = token_data.get("access_token")
+            expires_in = float(token_data.get("expires_in", 1800))
+            self._expires_at = now + expires_in
+            # 수명의 TOKEN_REFRESH_FRACTION 이상을 margin으로 쓰지 않음
+            self._refresh_at = self._expires_at - min(self.refresh_margin, expires_in * TOKEN_REFRESH_FRACTION)
+            return self._token
+
+_hume_tokens = HumeTokenCache()
 
 class EmotionService:
     def __init__(self, service_type: str):
@@ -10,131 +161,221 @@ class EmotionService:
         
     async def analyze_emotion(self, text: str) -> tuple[Optional[str], Optional[Dict[str, float]]]:
         """텍스트에서 감정을 분석하고 주요 감정과 전체 점수를 반환"""
+        if self.service_type == "local":
+            # 프로세스 내 분류기는 네트워크 호출이 없으므로 리미터/차단기 없이 바로 실행
+            return self._local_emotion(text)
         if self.service_type == "hume":
-            return await self._hume_emotion(text)
+            provider_call = self._hume_emotion
         elif self.service_type == "mago":
-            return await self._mago_emotion(text)
+            provider_call = self._mago_emotion
         else:
             raise ValueError(f"Unsupported emotion service: {self.service_type}")
+        
+        cache_key = emotion_cache.make_key("emotion", self.service_type, text)
+        cached = await emotion_cache.get(cache_key)
+        tracing.record_cache("emotion", cached is not None)
+        if cached is not None:
+            return cached
+        
+        emotion, emotion_scores = await _inflight.do(
+            ("emotion", self.service_type, cache_key),
+            lambda: self._guarded_call(provider_call, text)
+        )
+        # 실제 예측 결과만 캐시 (분석 실패/시간 초과가 TTL 동안 고정되지 않도록)
+        if emotion_scores:
+            await emotion_cache.set(cache_key, (emotion, emotion_scores))
+        return emotion, emotion_scores
+    
+    async def _guarded_call(self, provider_call, text: str) -> tuple[Optional[str], Optional[Dict[str, float]]]:
+        # 감정 분석은 선택 단계이므로 차단기가 열려 있거나 포화 상태면 즉시 감정 없이 진행
+        try:
+            return await provider_call(text)
+        except ProviderOverloaded as e:
+            print(f"Emotion analysis skipped: {e}")
+            return None, None
+        except Exception as e:
+            print(f"Emotion analysis failed: {e}")
+            return None, None
+    
+    async def _limited_call(self, provider_call, *args):
+        """리미터(RPM, 동시 요청 수)와 차단기를 거쳐 프로바이더를 한 번 호출"""
+        breaker = get_breaker(self.service_type)
+        breaker.check()
+        async with get_limiter(self.service_type).limit():
+            async with breaker.call():
+                return await provider_call(*args)
+    
+    def _local_emotion(self, text: str) -> tuple[Optional[str], Optional[Dict[str, float]]]:
+        """내장 사전 기반 감정 분석 (오프라인)"""
+        emotion_scores = local_emotion.classify(text)
+        top_emotion = max(emotion_scores, key=emotion_scores.get)
+        return EMOTION_LABELS_KO.get(top_emotion, top_emotion), emotion_scores
     
     async def _hume_emotion(self, text: str) -> tuple[Optional[str], Optional[Dict[str, float]]]:
         """Hume AI Expression Measurement API - 실시간 감정 분석"""
-        api_key = os.getenv("HUME_API_KEY")
-        secret_key = os.getenv("HUME_SECRET_KEY")
+        global _hume_stream_retry_at
+        if HUME_MODE == "stream" and time.monotonic() >= _hume_stream_retry_at:
+            api_key = os.getenv("HUME_API_KEY")
+            if not api_key:
+                print("Hume API key not found")
+                return None, None
+            try:
+                return await self._limited_call(self._hume_stream_emotion, text, api_key)
+            except ProviderOverloaded:
+                raise
+            except HumeStreamUnavailable as e:
+                # 연결 자체가 안 되는 경우에만 잠시 모든 요청을 batch로 보냄
+                print(f"Hume streaming unavailable, falling back to batch: {e}")
+                _hume_stream_retry_at = time.monotonic() + HUME_STREAM_RETRY_AFTER
+            except Exception as e:
+                # 요청 내용 오류나 응답 지연은 이번 요청만 batch로 처리
+                print(f"Hume streaming failed, falling back to batch: {e}")
         
-        if not api_key:
-            print("Hume API key not found")
-            return None, None
+        return await self._hume_batch_emotion(text)
+    
+    async def _hume_stream_emotion(self, text: str, api_key: str) -> tuple[Optional[str], Optional[Dict[str, float]]]:
+        """Hume Streaming API (지속 연결 재사용)"""
+        result = await get_hume_stream().analyze_text(text, api_key)
+        predictions = result.get("language", {}).get("predictions", [])
+        return self._parse_hume_predictions([{"predictions": predictions}])
+    
+    async def _hume_batch_emotion(self, text: str) -> tuple[Optional[str], Optional[Dict[str, float]]]:
+        """Hume Batch Job API (동시 요청과 묶어서 제출)"""
+        return await _hume_batcher.submit(text)
+    
+    async def _run_hume_batch(self, texts: List[str]) -> List[tuple[Optional[str], Optional[Dict[str, float]]]]:
+        """여러 텍스트를 하나의 Batch Job으로 분석하고 입력 순서대로 결과 반환
+        
+        리미터와 차단기에는 텍스트 수와 관계없이 Job 하나로 기록한다.
+        """
+        return await self._limited_call(self._submit_hume_job, texts)
+    
+    async def _submit_hume_job(self, texts: List[str]) -> List[tuple[Optional[str], Optional[Dict[str, float]]]]:
+        headers = await self._hume_headers()
+        if headers is None:
+            return [(None, None) for _ in texts]
         
+        client = get_hume_client()
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                # 1. 먼저 액세스 토큰 획득
-                access_token = None
-                if secret_key:
-                    # Basic Auth를 사용한 토큰 요청
-                    auth_string = f"{api_key}:{secret_key}"
-                    auth_header = base64.b64encode(auth_string.encode()).decode()
-                    
-                    token_response = await client.post(
-                        "https://api.hume.ai/v0/auth/token",
-                        headers={
-                            "Authorization": f"Basic {auth_header}",
-                            "Content-Type": "application/x-www-form-urlencoded"
-                        },
-                        data={"grant_type": "client_credentials"}
-                    )
-                    
-                    if token_response.status_code == 200:
-                        token_data = token_response.json()
-                        access_token = token_data.get("access_token")
-                    else:
-                        print(f"Failed to get Hume access token: {token_response.status_code}, {token_response.text}")
-                        # API Key로 fallback
-                        headers = {
-                            "X-Hume-Api-Key": api_key,
-                            "Content-Type": "application/json"
+            # Expression Measurement API 엔드포인트
+            response = await client.post(
+                "/v0/batch/jobs",
+                headers=headers,
+                json={
+                    "models": {
+                        "language": {
+                            "granularity": "sentence",
+                            "identify_speakers": False
                         }
-                else:
-                    # API Key만 사용
-                    headers = {
-                        "X-Hume-Api-Key": api_key,
-                        "Content-Type": "application/json"
-                    }
-                
-                # 2. 액세스 토큰을 사용하여 감정 분석 요청
-                if access_token:
-                    headers = {
-                        "Authorization": f"Bearer {access_token}",
-                        "Content-Type": "application/json"
-                    }
+                    },
+                    "text": texts,
+                    "notify": False
+                }
+            )
+            
+            if response.status_code == 200 or response.status_code == 201:
+                result = response.json()
                 
-                # Expression Measurement API 엔드포인트
-                response = await client.post(
-                    "https://api.hume.ai/v0/batch/jobs",
-                    headers=headers,
-                    json={
-                        "models": {
-                            "language": {
-                                "granularity": "sentence",
-                                "identify_speakers": False
-                            }
-                        },
-                        "text": [text],
-                        "notify": False
-                    }
-                )
+                # 즉시 결과가 반환되는 경우 (동기 처리)
+                if "predictions" in result:
+                    return self._parse_hume_batch(result["predictions"], len(texts))
                 
-                if response.status_code == 200 or response.status_code == 201:
-                    result = response.json()
-                    
-                    # 즉시 결과가 반환되는 경우 (동기 처리)
-                    if "predictions" in result:
-                        return self._parse_hume_predictions(result["predictions"])
+                # Job ID가 반환되는 경우 (비동기 처리)
+                elif "job_id" in result:
+                    job_id = result["job_id"]
                     
-                    # Job ID가 반환되는 경우 (비동기 처리)
-                    elif "job_id" in result:
-                        job_id = result["job_id"]
+                    # Job 상태 확인 및 결과 가져오기 (적응형 백오프, 최대 HUME_BATCH_TIMEOUT초)
+                    deadline = time.monotonic() + HUME_BATCH_TIMEOUT
+                    delay = HUME_POLL_INITIAL
+                    while time.monotonic() + delay < deadline:
+                        await asyncio.sleep(delay)
+                        delay = min(delay * HUME_POLL_FACTOR, HUME_POLL_MAX)
                         
-                        # Job 상태 확인 및 결과 가져오기
-                        import asyncio
-                        for _ in range(10):  # 최대 10초 대기
-                            await asyncio.sleep(1)
-                            
-                            status_response = await client.get(
-                                f"https://api.hume.ai/v0/batch/jobs/{job_id}",
-                                headers=headers
-                            )
+                        status_response = await client.get(
+                            f"/v0/batch/jobs/{job_id}",
+                            headers=headers
+                        )
+                        
+                        if status_response.status_code == 200:
+                            status_data = status_response.json()
                             
-                            if status_response.status_code == 200:
-                                status_data = status_response.json()
+                            if status_data.get("state", {}).get("status") == "COMPLETED":
+                                # 예측 결과 가져오기
+                                pred_response = await client.get(
+                                    f"/v0/batch/jobs/{job_id}/predictions",
+                                    headers=headers
+                                )
                                 
-                                if status_data.get("state", {}).get("status") == "COMPLETED":
-                                    # 예측 결과 가져오기
-                                    pred_response = await client.get(
-                                        f"https://api.hume.ai/v0/batch/jobs/{job_id}/predictions",
-                                        headers=headers
-                                    )
-                                    
-                                    if pred_response.status_code == 200:
-                                        predictions = pred_response.json()
-                                        return self._parse_hume_predictions(predictions)
-                                    break
-                                elif status_data.get("state", {}).get("status") == "FAILED":
-                                    print(f"Hume job failed: {status_data}")
-                                    break
-                    
-                    return "중립", {}
-                    
-                else:
-                    print(f"Hume API error: {response.status_code}, {response.text}")
-                    return None, None
+                                if pred_response.status_code == 200:
+                                    predictions = pred_response.json()
+                                    return self._parse_hume_batch(predictions, len(texts))
+                                raise RuntimeError(f"Hume predictions error: {pred_response.status_code}")
+                            elif status_data.get("state", {}).get("status") == "FAILED":
+                                raise RuntimeError(f"Hume job failed: {status_data}")
                     
+                    raise RuntimeError(f"Hume job {job_id} did not complete in {HUME_BATCH_TIMEOUT}s")
+                
+                raise RuntimeError(f"Unexpected Hume job response: {result}")
+                
+            else:
+                if response.status_code == 401:
+                    # 토큰이 서버 측에서 무효화된 경우 다음 요청에서 새로 발급
+                    _hume_tokens.invalidate()
+                raise RuntimeError(f"Hume API error: {response.status_code}, {response.text}")
+                
         except Exception as e:
             print(f"Hume emotion analysis error: {e}")
-            return None, None
+            raise
+    
+    async def _hume_headers(self) -> Optional[Dict[str, str]]:
+        """Hume 인증 헤더 (캐시된 액세스 토큰 우선, 없으면 API Key)"""
+        api_key = os.getenv("HUME_API_KEY")
+        secret_key = os.getenv("HUME_SECRET_KEY")
+        
+        if not api_key:
+            print("Hume API key not found")
+            return None
+        
+        access_token = None
+        if secret_key:
+            access_token = await _hume_tokens.get_token(api_key, secret_key)
+        
+        if access_token:
+            return {
+                "Authorization": f"Bearer {access_token}",
+                "Content-Type": "application/json"
+            }
+        # API Key로 fallback
+        return {
+            "X-Hume-Api-Key": api_key,
+            "Content-Type": "application/json"
+        }
+    
+    def _parse_hume_batch(self, predictions_data, count: int) -> List[tuple[Optional[str], Optional[Dict[str, float]]]]:
+        """여러 텍스트를 담은 Batch Job 결과를 텍스트별로 나누어 파싱"""
+        if count == 1:
+            return [self._parse_hume_predictions(predictions_data)]
+        
+        # 텍스트마다 별도 결과 항목이 오는 경우
+        if isinstance(predictions_data, list) and len(predictions_data) == count:
+            return [self._parse_hume_predictions([item]) for item in predictions_data]
+        
+        # 하나의 결과 항목 안에 텍스트별 예측이 나열된 경우
+        try:
+            per_text = predictions_data[0]["results"]["predictions"]
+        except (IndexError, KeyError, TypeError):
+            per_text = []
+        if len(per_text) == count:
+            return [
+                self._parse_hume_predictions([{"results": {"predictions": [pred]}}])
+                for pred in per_text
+            ]
+        
+        print(f"Unexpected Hume batch result shape for {count} texts")
+        return [(None, None) for _ in range(count)]
     
     def _parse_hume_predictions(self, predictions_data):
-        """Hume AI 예측 결과 파싱"""
+        """Hume AI 예측 결과 파싱 (감정 점수가 없으면 (None, None))"""
         try:
             if isinstance(predictions_data, list) and len(predictions_data) > 0:
                 first_result = predictions_data[0]
@@ -145,7 +386,7 @@ class EmotionService:
                 elif "predictions" in first_result:
                     predictions = first_result["predictions"]
                 else:
-                    return "중립", {}
+                    return None, None
                 
                 if predictions and len(predictions) > 0:
                     pred = predictions[0]
@@ -174,47 +415,20 @@ class EmotionService:
                         emotion_name = top_emotion["name"]
                         
                         # 한국어 감정 매핑
-                        emotion_map = {
-                            "Joy": "기쁨",
-                            "Sadness": "슬픔",
-                            "Anger": "분노",
-                            "Fear": "두려움",
-                            "Surprise": "놀람",
-                            "Disgust": "혐오",
-                            "Contempt": "경멸",
-                            "Shame": "수치심",
-                            "Guilt": "죄책감",
-                            "Pride": "자부심",
-                            "Embarrassment": "당황",
-                            "Amusement": "즐거움",
-                            "Interest": "관심",
-                            "Calmness": "평온",
-                            "Calm": "평온",
-                            "Confusion": "혼란",
-                            "Disappointment": "실망",
-                            "Love": "사랑",
-                            "Admiration": "감탄",
-                            "Sympathy": "동정",
-                            "Satisfaction": "만족",
-                            "Excitement": "흥분",
-                            "Awe": "경외",
-                            "Boredom": "지루함",
-                            "Concentration": "집중",
-                            "Determination": "결단",
-                            "Relief": "안도"
-                        }
-                        
-                        main_emotion = emotion_map.get(emotion_name, emotion_name)
+                        main_emotion = EMOTION_LABELS_KO.get(emotion_name, emotion_name)
                         return main_emotion, emotion_scores
             
-            return "중립", {}
+            return None, None
             
         except Exception as e:
             print(f"Error parsing Hume predictions: {e}")
-            return "중립", {}
+            return None, None
     
     async def _mago_emotion(self, text: str) -> tuple[Optional[str], Optional[Dict[str, float]]]:
         """Mago 감정 분석"""
+        return await self._limited_call(self._mago_request, text)
+    
+    async def _mago_request(self, text: str) -> tuple[Optional[str], Optional[Dict[str, float]]]:
         api_key = os.getenv("MAGO_API_KEY")
         if not api_key:
             print("Mago API key not found")
@@ -222,4 +436,10 @@ class EmotionService:
         
         # Mago API는 현재 구현되지 않음
         print("Mago API is not implemented yet")
-        return None, None
\ No newline at end of file
+        return None, None
+
+_hume_batcher = MicroBatcher(
+    lambda texts: EmotionService("hume")._run_hume_batch(texts),
+    window=HUME_BATCH_WINDOW,
+    max_batch=HUME_BATCH_MAX_SIZE
+)
\ No newline at end of file
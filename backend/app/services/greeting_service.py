@@ -0,0 +1,81 @@
+import os
+import json
+import hashlib
+from typing import Optional
+from sqlalchemy.orm import Session
+from app import crud, models
+from app.database import SessionLocal
+from app.services.llm_service import LLMService, ERROR_RESPONSE
+from app.services.tts_service import TTSService
+from app.services.audio_store import get_audio_store
+from app.services.prompts import GREETING_PROMPT, build_system_prompt
+
+# 인사말 음성을 함께 미리 생성할지 여부
+GREETING_TTS = os.getenv("GREETING_TTS", "True").lower() == "true"
+
+def greeting_hash(agent: models.Agent) -> str:
+    """인사말 생성 입력값의 해시 (입력이 바뀌면 인사말도 다시 생성)"""
+    inputs = [agent.prompt, agent.scenario, agent.llm_module, agent.tts_module, GREETING_PROMPT]
+    return hashlib.sha256(json.dumps(inputs, ensure_ascii=False).encode()).hexdigest()
+
+def is_greeting_fresh(agent: models.Agent) -> bool:
+    return bool(agent.greeting) and agent.greeting_hash == greeting_hash(agent)
+
+def is_greeting_audio_available(audio_url: str) -> bool:
+    """저장소의 인사말 음성 파일이 남아 있는지 확인하고 사용 시각 갱신 (정리 대상에서 늦춤)"""
+    store = get_audio_store()
+    name = store.name_from_url(audio_url)
+    if name is None:
+        # 저장소 밖의 URL은 확인할 수 없으므로 그대로 사용
+        return True
+    if not store.exists(name):
+        return False
+    store.touch(name)
+    return True
+
+def default_greeting(agent: models.Agent) -> str:
+    return f"안녕하세요! {agent.name}입니다. 무엇을 도와드릴까요?"
+
+async def ensure_agent_greeting(db: Session, agent: models.Agent) -> tuple[str, Optional[str]]:
+    """저장된 인사말이 최신이면 그대로 반환하고, 아니면 생성 후 저장"""
+    if is_greeting_fresh(agent):
+        audio_url = agent.greeting_audio_url
+        if not audio_url or is_greeting_audio_available(audio_url):
+            return agent.greeting, audio_url
+        # 음성 파일만 저장소 정리로 삭제된 경우 인사말은 그대로 두고 음성만 다시 생성
+        audio_url = await TTSService(agent.tts_module).text_to_speech(agent.greeting)
+        crud.update_agent_greeting(db, agent, agent.greeting, audio_url, agent.greeting_hash)
+        return agent.greeting, audio_url
+    
+    input_hash = greeting_hash(agent)
+    llm_service = LLMService(agent.llm_module, agent.llm_fallbacks)
+    greeting = await llm_service.generate_response(
+        message=GREETING_PROMPT,
+        system_prompt=build_system_prompt(agent),
+        emotion=None,
+        cache_ttl=agent.response_cache_ttl
+    )
+    if not greeting or greeting == ERROR_RESPONSE:
+        raise RuntimeError("Greeting generation failed")
+    
+    audio_url = None
+    if GREETING_TTS and agent.tts_module:
+        audio_url = await TTSService(agent.tts_module).text_to_speech(greeting)
+    
+    # 생성 중에 에이전트가 다시 수정되었다면 오래된 결과는 저장하지 않음
+    db.refresh(agent)
+    if greeting_hash(agent) == input_hash:
+        crud.update_agent_greeting(db, agent, greeting, audio_url, input_hash)
+    return greeting, audio_url
+
+async def refresh_agent_greeting(agent_id: int):
+    """에이전트 생성/수정 후 백그라운드에서 인사말을 미리 생성"""
+    db = SessionLocal()
+    try:
+        agent = crud.get_agent(db, agent_id)
+        if agent:
+            await ensure_agent_greeting(db, agent)
+    except Exception as e:
+        print(f"Greeting precompute error (agent {agent_id}): {e}")
+    finally:
+        db.close()
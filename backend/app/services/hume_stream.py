@@ -0,0 +1,105 @@
+import os
+import json
+import asyncio
+from typing import Optional, Dict, Any, List
+import websockets
+
+HUME_STREAM_URL = "wss://api.hume.ai/v0/stream/models"
+
+class HumeStreamError(Exception):
+    pass
+
+class HumeStreamUnavailable(HumeStreamError):
+    """연결/핸드셰이크 실패 (요청 내용과 무관하게 스트리밍을 사용할 수 없음)"""
+    pass
+
+class HumeStreamPool:
+    """Hume 스트리밍(WebSocket) 연결 풀
+
+    연결을 요청마다 새로 맺지 않고 재사용한다. 하나의 연결은 한 번에
+    하나의 요청만 처리하므로 pool_size만큼 동시에 분석할 수 있다.
+    끊어진 연결은 다음 사용 시 다시 연결한다.
+    """
+
+    def __init__(self, pool_size: int = 4, timeout: float = 5.0):
+        self.timeout = timeout
+        self._slots: asyncio.Queue = asyncio.Queue()
+        for _ in range(pool_size):
+            self._slots.put_nowait(None)
+
+    async def analyze_text(self, text: str, api_key: str) -> Dict[str, Any]:
+        """language 모델로 텍스트 감정 예측 (Hume 응답 JSON 반환)"""
+        payload = json.dumps({
+            "models": {"language": {}},
+            "raw_text": True,
+            "data": text
+        })
+
+        ws = await self._slots.get()
+        try:
+            # 유휴 시간 초과 등으로 서버가 끊은 연결은 한 번만 재연결 후 재시도
+            for attempt in range(2):
+                if ws is None or ws.closed:
+                    ws = await self._connect(api_key)
+                try:
+                    await ws.send(payload)
+                    result = json.loads(await asyncio.wait_for(ws.recv(), timeout=self.timeout))
+                    break
+                except websockets.ConnectionClosed as e:
+                    ws = None
+                    if attempt == 1:
+                        raise HumeStreamUnavailable(f"connection closed: {e}") from e
+            if "error" in result:
+                raise HumeStreamError(f"{result.get('code')}: {result.get('error')}")
+            return result
+        except BaseException:
+            # 응답 순서가 어긋났을 수 있는 연결은 재사용하지 않음
+            if ws is not None:
+                await _close_quietly(ws)
+            ws = None
+            raise
+        finally:
+            self._slots.put_nowait(ws)
+
+    async def _connect(self, api_key: str):
+        try:
+            return await asyncio.wait_for(
+                websockets.connect(
+                    HUME_STREAM_URL,
+                    extra_headers={"X-Hume-Api-Key": api_key},
+                    max_size=2 ** 22
+                ),
+                timeout=self.timeout
+            )
+        except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+            raise HumeStreamUnavailable(f"connect failed: {e!r}") from e
+
+    async def close(self):
+        connections: List = []
+        while not self._slots.empty():
+            connections.append(self._slots.get_nowait())
+        for ws in connections:
+            if ws is not None:
+                await _close_quietly(ws)
+            self._slots.put_nowait(None)
+
+async def _close_quietly(ws):
+    try:
+        await ws.close()
+    except Exception:
+        pass
+
+_pool: Optional[HumeStreamPool] = None
+
+def get_hume_stream() -> HumeStreamPool:
+    global _pool
+    if _pool is None:
+        _pool = HumeStreamPool(
+            pool_size=int(os.getenv("HUME_STREAM_POOL_SIZE", "4")),
+            timeout=float(os.getenv("HUME_STREAM_TIMEOUT", "5"))
+        )
+    return _pool
+
+async def close_hume_stream():
+    if _pool is not None:
+        await _pool.close()
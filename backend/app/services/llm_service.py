@@ -1,58 +1,291 @@
 import os
-from typing import Optional
-import openai
-import anthropic
-import google.generativeai as genai
+import time
+import asyncio
+from typing import Optional, AsyncIterator, List
+from app.services.clients import get_anthropic_client, get_openai_client, get_gemini_model
+from app.services.cache import response_cache
+from app.services.singleflight import SingleFlight
+from app.services.latency import LatencyTracker
+from app.services.rate_limit import get_limiter, estimate_tokens, ProviderOverloaded
+from app.services.circuit_breaker import get_breaker
+from app.services import tracing
+from app.schemas import LLM_PROVIDERS
+
+CLAUDE_MODEL = "claude-3-5-haiku-20241022"  # 최신 Haiku 모델
+OPENAI_MODEL = "gpt-3.5-turbo"  # 빠른 모델
+MAX_TOKENS = 1000
+ERROR_RESPONSE = "죄송합니다. 응답 생성 중 오류가 발생했습니다."
+EMPTY_RESPONSE = "응답을 생성할 수 없습니다."
+
+SUPPORTED_PROVIDERS = LLM_PROVIDERS
+
+# 헤지 지연: 프로바이더의 최근 p95 응답 시간을 사용하되 아래 범위로 제한
+HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "1.0"))
+HEDGE_MAX_DELAY = float(os.getenv("LLM_HEDGE_MAX_DELAY", "10.0"))
+HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "5.0"))
+HEDGE_MIN_SAMPLES = 20
+
+class StreamInterrupted(Exception):
+    """토큰 일부를 보낸 뒤 스트리밍이 실패함 (보낸 내용은 완성된 응답이 아님)"""
+
+    def __init__(self, provider: str, partial: str, cause: Exception):
+        super().__init__(f"{provider} stream interrupted after {len(partial)} chars: {cause}")
+        self.provider = provider
+        self.partial = partial
+
+# 동일한 요청이 동시에 들어오면 프로바이더 호출을 하나로 합침
+_inflight = SingleFlight()
+_latency = LatencyTracker()
+
+def hedge_delay(provider: str) -> float:
+    """보조 프로바이더를 투입하기 전까지 기다릴 시간(초)"""
+    if _latency.count(provider) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY
+    p95 = _latency.percentile(provider, 0.95)
+    return min(HEDGE_MAX_DELAY, max(HEDGE_MIN_DELAY, p95))
 
 class LLMService:
-    def __init__(self, service_type: str = "gpt"):
+    def __init__(self, service_type: str = "gpt", fallbacks: Optional[List[str]] = None):
         self.service_type = service_type
+        # 주 프로바이더가 느리거나 실패할 때 순서대로 투입할 보조 프로바이더
+        self.fallbacks = [p for p in (fallbacks or []) if p != service_type]
         
-    def generate_response(
+    async def generate_response(
         self, 
         message: str, 
         system_prompt: str = "당신은 도움이 되는 AI 어시스턴트입니다.",
-        emotion: Optional[str] = None
+        emotion: Optional[str] = None,
+        use_cache: bool = True,
+        cache_ttl: Optional[int] = None
     ) -> str:
-        """LLM을 사용하여 응답 생성"""
+        """LLM을 사용하여 응답 생성
+        
+        동일한 (provider, system_prompt, emotion, message) 요청은 응답 캐시에서 반환한다.
+        캐시는 cache_ttl(초)을 지정한 호출만 사용하고(None/0이면 캐시 안 함),
+        use_cache=False면 요청 단위로 건너뛴다.
+        """
+        cache_key = self._cache_key(message, system_prompt, emotion, use_cache, cache_ttl)
+        if cache_key:
+            cached = await response_cache.get(cache_key)
+            tracing.record_cache("response", cached is not None)
+            if cached is not None:
+                return cached
+        
+        system_prompt = self._apply_emotion(system_prompt, emotion)
+        providers = self._providers()
+        
+        try:
+            response = await _inflight.do(
+                ("llm", tuple(providers), system_prompt, message),
+                lambda: self._hedged_response(providers, message, system_prompt)
+            )
+        except ProviderOverloaded:
+            # 모든 프로바이더가 포화 상태면 호출자가 429/503으로 응답하도록 전달
+            raise
+        except Exception as e:
+            print(f"LLM generation failed ({', '.join(providers)}): {e}")
+            return ERROR_RESPONSE
+        
+        if cache_key and self._is_cacheable(response):
+            await response_cache.set(cache_key, response, ttl=cache_ttl)
+        return response
+    
+    async def stream_response(
+        self, 
+        message: str, 
+        system_prompt: str = "당신은 도움이 되는 AI 어시스턴트입니다.",
+        emotion: Optional[str] = None,
+        use_cache: bool = True,
+        cache_ttl: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """LLM 응답을 생성되는 대로 텍스트 조각 단위로 반환
+        
+        토큰을 보낸 뒤 프로바이더가 실패하면 잘린 응답을 캐시하지 않고 StreamInterrupted를 발생시킨다.
+        """
+        cache_key = self._cache_key(message, system_prompt, emotion, use_cache, cache_ttl)
+        if cache_key:
+            cached = await response_cache.get(cache_key)
+            tracing.record_cache("response", cached is not None)
+            if cached is not None:
+                yield cached
+                return
+        
+        system_prompt = self._apply_emotion(system_prompt, emotion)
+        
+        # 스트리밍은 첫 토큰 전에 실패한 경우에만 다음 프로바이더로 넘어감
+        chunks = []
+        last_error: Optional[Exception] = None
+        for provider in self._providers():
+            if provider == "claude":
+                stream = self._claude_stream(message, system_prompt)
+            elif provider == "gpt":
+                stream = self._openai_stream(message, system_prompt)
+            else:
+                stream = self._gemini_stream(message, system_prompt)
+            
+            breaker = get_breaker(provider)
+            try:
+                breaker.check()
+                async with get_limiter(provider).limit(self._token_budget(message, system_prompt)):
+                    async with breaker.call():
+                        async for delta in stream:
+                            if delta:
+                                chunks.append(delta)
+                                yield delta
+                break
+            except Exception as e:
+                print(f"{provider} streaming error: {e}")
+                last_error = e
+                if chunks:
+                    raise StreamInterrupted(provider, "".join(chunks), e) from e
+        
+        if not chunks and isinstance(last_error, ProviderOverloaded):
+            # 모든 프로바이더가 포화 상태면 호출자가 429/503으로 응답하도록 전달 (generate_response와 동일)
+            raise last_error
+        # 토큰을 하나도 보내지 못한 경우에만 기본 오류 메시지로 대체
+        if not chunks:
+            yield ERROR_RESPONSE
+            return
+        
+        response = "".join(chunks)
+        if cache_key and self._is_cacheable(response):
+            await response_cache.set(cache_key, response, ttl=cache_ttl)
+    
+    def _providers(self) -> List[str]:
+        providers = [self.service_type] + self.fallbacks
+        for provider in providers:
+            if provider not in SUPPORTED_PROVIDERS:
+                raise ValueError(f"Unsupported LLM service: {provider}")
+        return providers
+    
+    async def _hedged_response(self, providers: List[str], message: str, system_prompt: str) -> str:
+        """주 프로바이더가 헤지 지연 안에 응답하지 않거나 실패하면 다음 프로바이더를 경쟁시킴
+        
+        가장 먼저 도착한 정상 응답을 사용하고 나머지 호출은 취소한다.
+        """
+        remaining = list(providers)
+        pending = {}
+        last_error: Optional[Exception] = None
+        
+        def launch():
+            provider = remaining.pop(0)
+            task = asyncio.create_task(self._timed_call(provider, message, system_prompt))
+            pending[task] = provider
+            return provider
         
+        current = launch()
+        try:
+            while pending:
+                timeout = hedge_delay(current) if remaining else None
+                done, _ = await asyncio.wait(
+                    pending.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # 헤지: 기존 호출은 유지한 채 다음 프로바이더를 추가 투입
+                    print(f"LLM hedge: {current} exceeded {timeout:.1f}s, racing {remaining[0]}")
+                    current = launch()
+                    continue
+                
+                for task in done:
+                    pending.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                
+                # 실패한 경우 대기 없이 바로 다음 프로바이더 투입
+                if remaining:
+                    current = launch()
+            
+            raise last_error or RuntimeError("No LLM provider available")
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _timed_call(self, provider: str, message: str, system_prompt: str) -> str:
+        if provider == "claude":
+            provider_call = self._claude_response
+        elif provider == "gpt":
+            provider_call = self._openai_response
+        else:
+            provider_call = self._gemini_response
+        
+        # 차단기가 열린 프로바이더는 대기열에 들어가지 않고 즉시 실패 → 다음 프로바이더로 전환
+        breaker = get_breaker(provider)
+        breaker.check()
+        async with get_limiter(provider).limit(self._token_budget(message, system_prompt)):
+            async with breaker.call():
+                started = time.monotonic()
+                response = await provider_call(message, system_prompt)
+                if not response or response == EMPTY_RESPONSE:
+                    raise RuntimeError(f"{provider} returned an empty response")
+        _latency.record(provider, time.monotonic() - started)
+        return response
+    
+    def _token_budget(self, message: str, system_prompt: str) -> int:
+        # TPM 예산은 입력 추정치 + 최대 출력 토큰으로 예약
+        return estimate_tokens(system_prompt, message) + MAX_TOKENS
+    
+    def check_capacity(self):
+        """보조 프로바이더까지 모두 대기열이 가득 찼으면 즉시 ProviderOverloaded 발생"""
+        overloaded = None
+        for provider in self._providers():
+            try:
+                get_breaker(provider).check()
+                get_limiter(provider).check()
+                return
+            except ProviderOverloaded as e:
+                overloaded = e
+        raise overloaded
+    
+    def _cache_key(
+        self,
+        message: str,
+        system_prompt: str,
+        emotion: Optional[str],
+        use_cache: bool,
+        cache_ttl: Optional[int]
+    ) -> Optional[str]:
+        # 대화 맥락에 따라 답이 달라지는 에이전트도 있으므로 TTL을 지정한 경우에만 캐시 (opt-in)
+        if not use_cache or not cache_ttl:
+            return None
+        return response_cache.make_key(self.service_type, system_prompt, emotion, message)
+    
+    def _is_cacheable(self, response: Optional[str]) -> bool:
+        # 오류/빈 응답은 캐시하지 않음
+        return bool(response) and response not in (ERROR_RESPONSE, EMPTY_RESPONSE)
+    
+    def _apply_emotion(self, system_prompt: str, emotion: Optional[str]) -> str:
         # 감정이 있으면 시스템 프롬프트에 추가
         if emotion:
             system_prompt += f"\n\n사용자의 현재 감정: {emotion}. 이 감정을 고려하여 적절히 응답해주세요."
-        
-        if self.service_type == "claude":
-            return self._claude_response(message, system_prompt)
-        elif self.service_type == "gpt":
-            return self._openai_response(message, system_prompt)
-        elif self.service_type == "gemini":
-            return self._gemini_response(message, system_prompt)
-        else:
-            raise ValueError(f"Unsupported LLM service: {self.service_type}")
+        return system_prompt
     
-    def _claude_response(self, message: str, system_prompt: str) -> str:
+    async def _claude_response(self, message: str, system_prompt: str) -> str:
         """Anthropic Claude - Messages API 사용"""
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError("Anthropic API key not found")
-        
-        client = anthropic.Anthropic(api_key=api_key)
+        client = get_anthropic_client()
         
         try:
             # 신버전 Messages API 사용
-            response = client.messages.create(
-                model="claude-3-5-haiku-20241022",  # 최신 Haiku 모델
-                max_tokens=1000,
+            response = await client.messages.create(
+                model=CLAUDE_MODEL,
+                max_tokens=MAX_TOKENS,
                 system=system_prompt,
                 messages=[
                     {"role": "user", "content": message}
                 ]
             )
             
+            tracing.annotate(
+                model=CLAUDE_MODEL,
+                input_tokens=response.usage.input_tokens,
+                output_tokens=response.usage.output_tokens
+            )
+            
             # response.content는 리스트이므로 첫 번째 텍스트 블록 추출
             if response.content and len(response.content) > 0:
                 return response.content[0].text
             else:
-                return "응답을 생성할 수 없습니다."
+                return EMPTY_RESPONSE
                 
         except Exception as e:
             print(f"Claude API error: {e}")
@@ -60,48 +293,94 @@ class LLMService:
             if hasattr(e, 'response'):
                 print(f"Response status: {e.response.status_code if hasattr(e.response, 'status_code') else 'N/A'}")
                 print(f"Response body: {e.response.text if hasattr(e.response, 'text') else 'N/A'}")
-            return "죄송합니다. 응답 생성 중 오류가 발생했습니다."
+            raise
     
-    def _openai_response(self, message: str, system_prompt: str) -> str:
+    async def _openai_response(self, message: str, system_prompt: str) -> str:
         """OpenAI GPT"""
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OpenAI API key not found")
-        
-        client = openai.OpenAI(api_key=api_key)
+        client = get_openai_client()
         
         try:
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",  # 빠른 모델
-                max_tokens=1000,
+            response = await client.chat.completions.create(
+                model=OPENAI_MODEL,
+                max_tokens=MAX_TOKENS,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": message}
                 ]
             )
             
+            if response.usage:
+                tracing.annotate(
+                    model=OPENAI_MODEL,
+                    input_tokens=response.usage.prompt_tokens,
+                    output_tokens=response.usage.completion_tokens
+                )
             return response.choices[0].message.content
         except Exception as e:
             print(f"OpenAI API error: {e}")
-            return "죄송합니다. 응답 생성 중 오류가 발생했습니다."
+            raise
     
-    def _gemini_response(self, message: str, system_prompt: str) -> str:
+    async def _gemini_response(self, message: str, system_prompt: str) -> str:
         """Google Gemini"""
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            raise ValueError("Google API key not found")
-        
-        genai.configure(api_key=api_key)
+        model = get_gemini_model()
         
         try:
-            model = genai.GenerativeModel('gemini-2.0-flash-exp')
-            
-            # 시스템 프롬프트와 사용자 메시지 결합
-            full_prompt = f"{system_prompt}\n\n사용자: {message}\n\n어시스턴트:"
-            
-            response = model.generate_content(full_prompt)
+            response = await model.generate_content_async(self._gemini_prompt(message, system_prompt))
             
+            tracing.annotate(model=getattr(model, "model_name", None))
             return response.text
         except Exception as e:
             print(f"Gemini API error: {e}")
-            return "죄송합니다. 응답 생성 중 오류가 발생했습니다."
\ No newline at end of file
+            raise
+    
+    def _gemini_prompt(self, message: str, system_prompt: str) -> str:
+        # 시스템 프롬프트와 사용자 메시지 결합
+        return f"{system_prompt}\n\n사용자: {message}\n\n어시스턴트:"
+    
+    async def _claude_stream(self, message: str, system_prompt: str) -> AsyncIterator[str]:
+        """Anthropic Claude 스트리밍"""
+        client = get_anthropic_client()
+        
+        async with client.messages.stream(
+            model=CLAUDE_MODEL,
+            max_tokens=MAX_TOKENS,
+            system=system_prompt,
+            messages=[
+                {"role": "user", "content": message}
+            ]
+        ) as stream:
+            tracing.annotate(model=CLAUDE_MODEL)
+            async for text in stream.text_stream:
+                yield text
+            usage = (await stream.get_final_message()).usage
+            tracing.annotate(input_tokens=usage.input_tokens, output_tokens=usage.output_tokens)
+    
+    async def _openai_stream(self, message: str, system_prompt: str) -> AsyncIterator[str]:
+        """OpenAI GPT 스트리밍"""
+        client = get_openai_client()
+        
+        stream = await client.chat.completions.create(
+            model=OPENAI_MODEL,
+            max_tokens=MAX_TOKENS,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": message}
+            ],
+            stream=True
+        )
+        tracing.annotate(model=OPENAI_MODEL)
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    async def _gemini_stream(self, message: str, system_prompt: str) -> AsyncIterator[str]:
+        """Google Gemini 스트리밍"""
+        model = get_gemini_model()
+        
+        response = await model.generate_content_async(
+            self._gemini_prompt(message, system_prompt),
+            stream=True
+        )
+        tracing.annotate(model=getattr(model, "model_name", None))
+        async for chunk in response:
+            yield chunk.text
\ No newline at end of file
@@ -0,0 +1,101 @@
+import re
+from typing import Dict, List, Tuple
+
+# 프로세스 내 감정 분류기 (네트워크 없음, 요청당 1ms 미만)
+#
+# 한국어 어간/영어 단어 사전과 이모티콘·문장부호 단서로 점수를 매긴다.
+# 감정 이름은 Hume과 같은 이름을 사용하므로 같은 한국어 매핑을 그대로 쓸 수 있다.
+
+# (단서, 가중치) 목록. 한국어는 활용형을 잡기 위해 어간 부분 일치로 찾는다.
+KOREAN_LEXICON: Dict[str, List[Tuple[str, float]]] = {
+    "Joy": [("기쁘", 2.0), ("기뻐", 2.0), ("행복", 2.0), ("좋아", 1.0), ("좋다", 1.0), ("좋네", 1.0),
+            ("신나", 1.5), ("최고", 1.5), ("다행", 1.0)],
+    "Sadness": [("슬프", 2.0), ("슬퍼", 2.0), ("우울", 2.0), ("눈물", 1.5), ("외로", 1.5),
+                ("힘들", 1.5), ("그립", 1.0), ("속상", 1.5)],
+    "Anger": [("화나", 2.0), ("화가", 2.0), ("짜증", 2.0), ("열받", 2.0), ("빡치", 2.0),
+              ("어이없", 1.5), ("최악", 1.5)],
+    "Fear": [("무서", 2.0), ("두려", 2.0), ("겁나", 1.5), ("불안", 1.5), ("걱정", 1.0)],
+    "Surprise": [("놀라", 2.0), ("놀랐", 2.0), ("깜짝", 2.0), ("헐", 1.5), ("대박", 1.0), ("설마", 1.0)],
+    "Disgust": [("역겹", 2.0), ("징그", 2.0), ("더럽", 1.5), ("싫어", 1.0)],
+    "Embarrassment": [("민망", 2.0), ("창피", 2.0), ("부끄", 2.0)],
+    "Guilt": [("미안", 1.5), ("죄송", 1.5), ("잘못했", 2.0)],
+    "Pride": [("뿌듯", 2.0), ("자랑", 1.5)],
+    "Amusement": [("재밌", 2.0), ("재미있", 2.0), ("웃기", 2.0), ("웃겨", 2.0)],
+    "Interest": [("궁금", 2.0), ("알려", 1.0), ("어떻게", 1.0), ("뭐야", 1.0)],
+    "Confusion": [("헷갈", 2.0), ("모르겠", 2.0), ("이해가 안", 2.0), ("이상하", 1.0)],
+    "Disappointment": [("실망", 2.0), ("아쉽", 1.5), ("아쉬", 1.5), ("별로", 1.0), ("안 좋", 1.5)],
+    "Love": [("사랑", 2.0), ("좋아해", 2.0), ("보고 싶", 1.5), ("보고싶", 1.5)],
+    "Admiration": [("멋지", 2.0), ("멋있", 2.0), ("대단", 2.0), ("훌륭", 2.0), ("존경", 2.0)],
+    "Sympathy": [("안타깝", 2.0), ("안쓰", 2.0), ("힘내", 1.5)],
+    "Satisfaction": [("고마", 1.5), ("감사", 1.5), ("만족", 2.0), ("완벽", 1.5), ("괜찮", 1.0)],
+    "Excitement": [("기대", 1.5), ("설레", 2.0), ("두근", 2.0)],
+    "Boredom": [("지루", 2.0), ("심심", 2.0), ("따분", 2.0)],
+    "Relief": [("안심", 2.0), ("후련", 2.0), ("살았", 1.5)],
+    "Calmness": [("편안", 1.5), ("차분", 1.5), ("평화", 1.5)],
+}
+
+ENGLISH_LEXICON: Dict[str, List[Tuple[str, float]]] = {
+    "Joy": [("happy", 2.0), ("glad", 1.5), ("great", 1.0), ("awesome", 1.5), ("yay", 1.5)],
+    "Sadness": [("sad", 2.0), ("depressed", 2.0), ("lonely", 1.5), ("cry", 1.5), ("miss", 1.0)],
+    "Anger": [("angry", 2.0), ("mad", 1.5), ("furious", 2.0), ("annoyed", 1.5), ("hate", 1.5)],
+    "Fear": [("scared", 2.0), ("afraid", 2.0), ("worried", 1.5), ("anxious", 1.5)],
+    "Surprise": [("wow", 1.5), ("omg", 1.5), ("surprised", 2.0), ("really", 0.5)],
+    "Disgust": [("gross", 2.0), ("disgusting", 2.0)],
+    "Guilt": [("sorry", 1.5), ("apologize", 1.5)],
+    "Amusement": [("funny", 2.0), ("haha", 2.0), ("lol", 2.0), ("lmao", 2.0)],
+    "Interest": [("curious", 2.0), ("how", 0.5), ("why", 0.5), ("what", 0.5)],
+    "Confusion": [("confused", 2.0), ("unclear", 1.5)],
+    "Disappointment": [("disappointed", 2.0), ("unfortunately", 1.0)],
+    "Love": [("love", 2.0)],
+    "Admiration": [("amazing", 1.5), ("impressive", 2.0), ("brilliant", 1.5)],
+    "Satisfaction": [("thanks", 1.5), ("thank", 1.5), ("perfect", 1.5), ("satisfied", 2.0)],
+    "Excitement": [("excited", 2.0), ("can't wait", 2.0)],
+    "Boredom": [("bored", 2.0), ("boring", 2.0)],
+    "Relief": [("relieved", 2.0), ("phew", 1.5)],
+}
+
+# 이모티콘·문장부호 단서 (정규식, 감정, 매치당 가중치)
+CUES: List[Tuple[re.Pattern, str, float]] = [
+    (re.compile(r"[ㅠㅜ]{2,}"), "Sadness", 1.5),
+    (re.compile(r"ㅋ{2,}|ㅎ{2,}"), "Amusement", 1.5),
+    (re.compile(r"!{2,}"), "Excitement", 1.0),
+    (re.compile(r"!"), "Excitement", 0.3),
+    (re.compile(r"\?{2,}"), "Surprise", 1.0),
+    (re.compile(r"\?"), "Interest", 0.5),
+    (re.compile(r"\.{3,}|…"), "Sadness", 0.3),
+    (re.compile(r"[:;]-?\)|\^\^|\^_\^"), "Joy", 1.0),
+    (re.compile(r":-?\("), "Sadness", 1.0),
+]
+
+# 단서가 없을 때 평온이 가장 높게 나오도록 하는 기본값
+BASELINE = {"Calmness": 1.0}
+
+_WORD_RE = re.compile(r"[a-z']+")
+
+def classify(text: str) -> Dict[str, float]:
+    """텍스트의 감정 점수 (Hume 감정 이름 → 0~1, 합계 1) 반환"""
+    scores: Dict[str, float] = dict(BASELINE)
+    lowered = text.lower()
+
+    for emotion, cues in KOREAN_LEXICON.items():
+        for cue, weight in cues:
+            count = lowered.count(cue)
+            if count:
+                scores[emotion] = scores.get(emotion, 0.0) + weight * count
+
+    words = " ".join(_WORD_RE.findall(lowered))
+    if words:
+        padded = f" {words} "
+        for emotion, cues in ENGLISH_LEXICON.items():
+            for cue, weight in cues:
+                count = padded.count(f" {cue} ")
+                if count:
+                    scores[emotion] = scores.get(emotion, 0.0) + weight * count
+
+    for pattern, emotion, weight in CUES:
+        count = len(pattern.findall(text))
+        if count:
+            scores[emotion] = scores.get(emotion, 0.0) + weight * count
+
+    total = sum(scores.values())
+    return {emotion: round(score / total, 4) for emotion, score in scores.items()}
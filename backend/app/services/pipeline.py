@@ -0,0 +1,248 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from app.services import metrics
+
+class PipelineTimeout(Exception):
+    """요청 기한 안에 파이프라인이 끝나지 않음"""
+
+    def __init__(self, stages: Sequence[str]):
+        self.stages = list(stages)
+        super().__init__(f"Pipeline deadline exceeded (pending: {', '.join(self.stages)})")
+
+class Stage:
+    """파이프라인 단계
+
+    after에 적힌 단계가 모두 끝나야 시작한다. optional 단계가 실패하면 default를
+    결과로 사용하고 파이프라인은 계속 진행한다. background 단계는 run()이 끝나기를
+    기다리지 않으므로 다른 단계가 ctx.wait()로 필요한 만큼만 기다리는 데 사용한다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[["PipelineContext"], Awaitable[Any]],
+        after: Sequence[str] = (),
+        optional: bool = False,
+        default: Any = None,
+        background: bool = False
+    ):
+        self.name = name
+        self.run = run
+        self.after = tuple(after)
+        self.optional = optional
+        self.default = default
+        self.background = background
+
+class PipelineContext:
+    """한 번의 파이프라인 실행 상태 (단계 결과, 기한, 단계별 소요 시간, 스트리밍 이벤트)
+
+    state에는 요청별 입력을 담아 단계 함수에 전달한다.
+    """
+
+    def __init__(self, state: Any = None, timeout: Optional[float] = None):
+        self.state = state
+        self.timeout = timeout
+        self.timings: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._started: Optional[float] = None
+        self._deadline: Optional[float] = None
+
+    def remaining(self) -> Optional[float]:
+        """기한까지 남은 시간(초), 기한이 없으면 None"""
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    def elapsed_ms(self) -> float:
+        if self._started is None:
+            return 0.0
+        return (time.monotonic() - self._started) * 1000
+
+    def task(self, name: str) -> asyncio.Task:
+        return self._tasks[name]
+
+    def done(self, name: str) -> bool:
+        return self._tasks[name].done()
+
+    def result(self, name: str, default: Any = None) -> Any:
+        """이미 끝난 단계의 결과 (아직 실행 중이거나 취소됐으면 default)"""
+        task = self._tasks[name]
+        if not task.done() or task.cancelled() or task.exception() is not None:
+            return default
+        return task.result()
+
+    async def get(self, name: str) -> Any:
+        """단계가 끝날 때까지 기다려서 결과 반환
+
+        기다리는 쪽이 취소되어도 해당 단계는 취소되지 않는다.
+        """
+        task = self._tasks[name]
+        await asyncio.wait({task})
+        return task.result()
+
+    async def wait(self, name: str, timeout: Optional[float]) -> bool:
+        """단계를 최대 timeout초 기다리고 끝났으면 True (늦어도 단계는 계속 실행)"""
+        task = self._tasks[name]
+        if timeout is not None:
+            remaining = self.remaining()
+            if remaining is not None:
+                timeout = min(timeout, remaining)
+            timeout = max(timeout, 0)
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+        return task in done
+
+    def emit(self, event: str, data: Dict[str, Any]):
+        """Pipeline.stream()으로 전달할 이벤트 추가"""
+        self._events.put_nowait((event, data))
+
+    def pending(self) -> List[str]:
+        return [name for name, task in self._tasks.items() if not task.done()]
+
+    def cancel(self):
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+
+class Pipeline:
+    """단계와 의존 관계(DAG)로 정의하는 비동기 처리 흐름
+
+    run()은 의존하는 단계가 끝난 단계부터 동시에 실행하고, 필수 단계가 실패하면
+    나머지 단계를 취소한 뒤 그 예외를 그대로 전달한다. 기한(ctx.timeout)이 지나면
+    실행 중인 단계를 모두 취소하고 PipelineTimeout을 발생시킨다.
+    단계별/전체 소요 시간은 name 라벨로 metrics에 기록한다.
+    """
+
+    def __init__(self, name: str, stages: Sequence[Stage]):
+        self.name = name
+        self.stages = list(stages)
+        self._by_name = {stage.name: stage for stage in self.stages}
+        if len(self._by_name) != len(self.stages):
+            raise ValueError("Duplicate stage name")
+        self._check_graph()
+
+    def _check_graph(self):
+        visiting, visited = set(), set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline has a dependency cycle at stage: {name}")
+            visiting.add(name)
+            for dependency in self._by_name[name].after:
+                if dependency not in self._by_name:
+                    raise ValueError(f"Stage {name} depends on unknown stage: {dependency}")
+                visit(dependency)
+            visiting.discard(name)
+            visited.add(name)
+
+        for stage in self.stages:
+            visit(stage.name)
+
+    async def run(self, ctx: PipelineContext) -> PipelineContext:
+        ctx._started = time.monotonic()
+        if ctx.timeout is not None:
+            ctx._deadline = ctx._started + ctx.timeout
+        for stage in self.stages:
+            ctx._tasks[stage.name] = asyncio.ensure_future(self._run_stage(ctx, stage))
+
+        foreground = {ctx._tasks[stage.name] for stage in self.stages if not stage.background}
+        metrics.pipeline_in_flight.inc(pipeline=self.name)
+        outcome = "error"
+        try:
+            pending = foreground
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=ctx.remaining(), return_when=asyncio.FIRST_EXCEPTION
+                )
+                if not done:
+                    raise PipelineTimeout([name for name in ctx.pending() if ctx._tasks[name] in pending])
+                for task in done:
+                    if not task.cancelled() and task.exception() is not None:
+                        raise task.exception()
+            outcome = "ok"
+        except PipelineTimeout:
+            outcome = "timeout"
+            ctx.cancel()
+            raise
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            ctx.cancel()
+            raise
+        except BaseException:
+            ctx.cancel()
+            raise
+        finally:
+            metrics.pipeline_in_flight.dec(pipeline=self.name)
+            metrics.pipeline_seconds.observe(time.monotonic() - ctx._started, pipeline=self.name, outcome=outcome)
+        return ctx
+
+    async def stream(self, ctx: PipelineContext):
+        """run()을 실행하면서 단계가 ctx.emit()한 (이벤트, 데이터)를 순서대로 반환
+
+        모든 이벤트를 내보낸 뒤 run()의 예외가 있으면 발생시킨다.
+        """
+        runner = asyncio.ensure_future(self.run(ctx))
+        getter = None
+        try:
+            while True:
+                getter = asyncio.ensure_future(ctx._events.get())
+                done, _ = await asyncio.wait({getter, runner}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    yield getter.result()
+                    continue
+                getter.cancel()
+                break
+            while not ctx._events.empty():
+                yield ctx._events.get_nowait()
+            runner.result()
+        finally:
+            if getter is not None and not getter.done():
+                getter.cancel()
+            if not runner.done():
+                runner.cancel()
+
+    async def _run_stage(self, ctx: PipelineContext, stage: Stage) -> Any:
+        dependencies = [ctx._tasks[name] for name in stage.after]
+        if dependencies:
+            await asyncio.wait(dependencies)
+            for task in dependencies:
+                # 필수 단계가 실패했으면 run()이 파이프라인 전체를 취소함
+                if task.cancelled() or task.exception() is not None:
+                    raise asyncio.CancelledError()
+
+        started = time.monotonic()
+        status = "ok"
+        try:
+            return await stage.run(ctx)
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        except Exception as e:
+            status = "error"
+            if not stage.optional:
+                raise
+            print(f"Pipeline stage {stage.name} failed: {e}")
+            return stage.default
+        finally:
+            elapsed = time.monotonic() - started
+            ctx.timings[stage.name] = {
+                "start_ms": round((started - ctx._started) * 1000, 1),
+                "duration_ms": round(elapsed * 1000, 1),
+                "status": status
+            }
+            # 취소된 단계는 실제 소요 시간이 아니므로 지연 분포에서 제외
+            if status != "cancelled":
+                metrics.stage_seconds.observe(elapsed, pipeline=self.name, stage=stage.name)
+            if status == "error":
+                metrics.stage_errors.inc(pipeline=self.name, stage=stage.name)
+
+def server_timing(ctx: PipelineContext) -> str:
+    """단계별 소요 시간을 Server-Timing 헤더 값으로 변환"""
+    entries: List[Tuple[str, float]] = [
+        (name, timing["duration_ms"]) for name, timing in ctx.timings.items()
+    ]
+    entries.append(("total", round(ctx.elapsed_ms(), 1)))
+    return ", ".join(f"{name};dur={duration}" for name, duration in entries)
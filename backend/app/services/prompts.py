@@ -0,0 +1,11 @@
+DEFAULT_SYSTEM_PROMPT = "당신은 도움이 되는 AI 어시스턴트입니다."
+
+# 인사말 생성을 위한 프롬프트
+GREETING_PROMPT = "사용자가 처음 대화를 시작했습니다. 당신의 성격과 역할에 맞는 짧은 인사말을 한 문장으로 해주세요. 자기소개와 함께 도움을 제공할 준비가 되었음을 알려주세요."
+
+def build_system_prompt(agent) -> str:
+    """에이전트 프롬프트와 시나리오를 조합한 시스템 프롬프트"""
+    system_prompt = agent.prompt or DEFAULT_SYSTEM_PROMPT
+    if agent.scenario:
+        system_prompt += f"\n\n시나리오: {agent.scenario}"
+    return system_prompt
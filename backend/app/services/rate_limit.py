@@ -0,0 +1,169 @@
+import os
+import math
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+class ProviderOverloaded(Exception):
+    """외부 프로바이더 호출 대기열이 가득 찬 경우 (503)"""
+    status_code = 503
+
+    def __init__(self, provider: str, retry_after: float, reason: str = "queue full"):
+        super().__init__(f"{provider} overloaded: {reason}")
+        self.provider = provider
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+class RateLimitExceeded(ProviderOverloaded):
+    """RPM/TPM 예산을 대기 한도 안에 확보할 수 없는 경우 (429)"""
+    status_code = 429
+
+class TokenBucket:
+    """분당 예산을 가진 토큰 버킷 (예약 방식, 잔량이 음수가 되면 그만큼 대기)"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """amount만큼 사용하려면 기다려야 하는 시간(초)"""
+        self._refill()
+        deficit = amount - self.tokens
+        return deficit / self.rate if deficit > 0 else 0.0
+
+    def reserve(self, amount: float):
+        self._refill()
+        self.tokens -= amount
+
+    def refund(self, amount: float):
+        """호출하지 못한 예약 반환"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+class ProviderLimiter:
+    """프로바이더별 동시 호출 수, RPM/TPM 예산, 대기열 길이/대기 시간 제한"""
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int = 16,
+        rpm: float = 0,
+        tpm: float = 0,
+        max_queue: int = 64,
+        max_wait: float = 10.0
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    def check(self):
+        """대기열이 가득 찼으면 즉시 실패 (스트리밍 시작 전 확인용)"""
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise ProviderOverloaded(self.name, self.max_wait)
+
+    async def acquire(self, tokens: float = 0):
+        self.check()
+        self.waiting += 1
+        reserved_requests = 0
+        reserved_tokens = 0.0
+        try:
+            deadline = time.monotonic() + self.max_wait
+
+            # 1. 요청/토큰 예산 확보 (대기 한도를 넘으면 예약하지 않고 거절)
+            wait = 0.0
+            if self.requests:
+                wait = max(wait, self.requests.wait_time(1))
+            if self.tokens and tokens:
+                wait = max(wait, self.tokens.wait_time(min(tokens, self.tokens.capacity)))
+            if wait > self.max_wait:
+                self.rejected += 1
+                raise RateLimitExceeded(self.name, wait, "rate budget exhausted")
+            if self.requests:
+                self.requests.reserve(1)
+                reserved_requests = 1
+            if self.tokens and tokens:
+                reserved_tokens = min(tokens, self.tokens.capacity)
+                self.tokens.reserve(reserved_tokens)
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            # 2. 동시 호출 슬롯 확보
+            remaining = deadline - time.monotonic()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=max(remaining, 0.001))
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise ProviderOverloaded(self.name, self.max_wait, "concurrency limit")
+            self.in_flight += 1
+        except BaseException:
+            # 슬롯 대기 시간 초과/취소로 호출하지 못했으면 예약한 예산 반환
+            if reserved_requests:
+                self.requests.refund(reserved_requests)
+            if reserved_tokens:
+                self.tokens.refund(reserved_tokens)
+            raise
+        finally:
+            self.waiting -= 1
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def limit(self, tokens: float = 0):
+        await self.acquire(tokens)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected": self.rejected
+        }
+
+_limiters: Dict[str, ProviderLimiter] = {}
+
+def get_limiter(name: str) -> ProviderLimiter:
+    """프로바이더 이름별 공용 리미터 (LIMIT_<NAME>_* 환경변수로 설정)"""
+    limiter = _limiters.get(name)
+    if limiter is None:
+        prefix = f"LIMIT_{name.upper()}_"
+        limiter = ProviderLimiter(
+            name,
+            max_concurrency=int(os.getenv(prefix + "MAX_CONCURRENCY", "16")),
+            rpm=float(os.getenv(prefix + "RPM", "0")),
+            tpm=float(os.getenv(prefix + "TPM", "0")),
+            max_queue=int(os.getenv(prefix + "MAX_QUEUE", "64")),
+            max_wait=float(os.getenv(prefix + "MAX_WAIT", "10"))
+        )
+        _limiters[name] = limiter
+    return limiter
+
+def all_limiters() -> Dict[str, ProviderLimiter]:
+    return dict(sorted(_limiters.items()))
+
+def estimate_tokens(*texts: Optional[str]) -> int:
+    """대략적인 토큰 수 추정 (한국어 기준 약 2자당 1토큰)"""
+    return sum(len(text) for text in texts if text) // 2 + 1
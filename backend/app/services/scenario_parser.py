@@ -6,7 +6,7 @@ class ScenarioParser:
     """DM 시나리오 텍스트를 노드/엣지 구조로 변환"""
     
     @staticmethod
-    def parse_text_to_flow(text: str, llm_service) -> ScenarioFlow:
+    async def parse_text_to_flow(text: str, llm_service) -> ScenarioFlow:
         """텍스트를 노드와 엣지로 변환"""
         
         prompt = f"""
@@ -53,7 +53,7 @@ class ScenarioParser:
         
         try:
             # LLM 서비스를 통해 파싱
-            response = llm_service.generate_response(prompt, system_prompt="당신은 시나리오를 플로우차트로 변환하는 전문가입니다. JSON 형식으로만 응답하세요.")
+            response = await llm_service.generate_response(prompt, system_prompt="당신은 시나리오를 플로우차트로 변환하는 전문가입니다. JSON 형식으로만 응답하세요.")
             
             # JSON 파싱
             flow_data = json.loads(response)
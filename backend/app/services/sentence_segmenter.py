@@ -0,0 +1,69 @@
+import re
+from typing import List, Optional
+
+# 문장 끝: 종결 부호(연속 가능) + 닫는 따옴표/괄호, 그 뒤에 공백이 와야 확정
+# (숫자 바로 뒤의 점은 목록 번호로 보고 제외)
+_SENTENCE_END = re.compile(r"(?:[!?。！？…~]|(?<!\d)\.)[.!?。！？…~]*[\"'”’」』)\]]*(?=\s)")
+# 부호 없이 줄바꿈으로 끝나는 문장 (목록, 제목 등)
+_LINE_END = re.compile(r"\n+")
+# 너무 긴 문장을 나눌 때 사용할 위치 (쉼표, 연결 어미 뒤 공백)
+_SOFT_BREAK = re.compile(r"[,，、;:]\s|(?:고|며|면서|지만|는데|니까|어서|아서|해서)\s")
+
+class SentenceSegmenter:
+    """스트리밍 텍스트를 문장 단위로 분할 (한국어 기준)
+
+    "다. ", "요? ", "…\\n"처럼 종결 부호 뒤에 공백이 오거나 줄이 바뀌면 문장이 끝난 것으로 본다.
+    숫자 뒤의 점(23.5, 목록 번호 "1. ")은 문장 끝으로 보지 않고, min_chars 미만의 짧은 조각은
+    다음 문장과 합치며, max_chars를 넘도록 끝나지 않는 문장은 쉼표나 연결 어미 뒤에서 자른다.
+    """
+
+    def __init__(self, min_chars: int = 6, max_chars: int = 200):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """텍스트 조각을 추가하고 완성된 문장 목록 반환"""
+        self._buffer += text
+        sentences = []
+        position = 0
+        while True:
+            end = self._find_end(position)
+            if end is None:
+                break
+            sentence = self._buffer[:end].strip()
+            if len(sentence) >= self.min_chars:
+                sentences.append(sentence)
+                self._buffer = self._buffer[end:]
+                position = 0
+            else:
+                # 짧은 조각은 다음 문장과 합쳐서 내보냄
+                position = end
+        if not sentences and len(self._buffer) > self.max_chars:
+            split = self._soft_break()
+            sentences.append(self._buffer[:split].strip())
+            self._buffer = self._buffer[split:]
+        return [sentence for sentence in sentences if sentence]
+
+    def flush(self) -> Optional[str]:
+        """남은 텍스트를 마지막 문장으로 반환"""
+        sentence, self._buffer = self._buffer.strip(), ""
+        return sentence or None
+
+    def _find_end(self, start: int) -> Optional[int]:
+        ends = []
+        match = _SENTENCE_END.search(self._buffer, start)
+        if match:
+            ends.append(match.end())
+        match = _LINE_END.search(self._buffer, start)
+        if match:
+            ends.append(match.end())
+        return min(ends) if ends else None
+
+    def _soft_break(self) -> int:
+        limit = self._buffer[: self.max_chars]
+        breaks = [match.end() for match in _SOFT_BREAK.finditer(limit)]
+        if breaks:
+            return breaks[-1]
+        space = limit.rfind(" ")
+        return space + 1 if space > 0 else self.max_chars
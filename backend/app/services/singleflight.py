@@ -0,0 +1,45 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class _Call:
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.waiters = 0
+
+class SingleFlight:
+    """동일 키의 동시 호출을 하나로 합치고 결과를 공유
+
+    먼저 들어온 호출만 실제로 실행되고, 같은 키로 실행 중에 들어온 호출은
+    그 결과(또는 예외)를 함께 기다린다. 호출이 끝나면 키는 즉시 해제되므로
+    결과를 캐시하지는 않는다. 기다리는 쪽이 모두 취소되면 실행 중인 호출도 취소한다.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.shared = 0  # 합쳐진(실행을 생략한) 호출 수
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is not None:
+            self.shared += 1
+        else:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.future.add_done_callback(lambda _: self._release(key, call))
+
+        call.waiters += 1
+        try:
+            # 대기자 하나가 취소되어도 다른 대기자가 있으면 공유 중인 호출은 계속 실행
+            return await asyncio.shield(call.future)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.future.done():
+                # 결과를 기다리는 쪽이 없으면 프로바이더 호출(리미터 슬롯, 과금)도 중단
+                call.future.cancel()
+
+    def _release(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # 모든 대기자가 취소된 경우에도 예외가 "never retrieved" 경고로 남지 않도록 처리
+        if not call.future.cancelled():
+            call.future.exception()
@@ -1,57 +1,118 @@
 import os
+import asyncio
 import tempfile
-from typing import Optional
-import openai
+from typing import Optional, Union, BinaryIO
 import azure.cognitiveservices.speech as speechsdk
 from google.cloud import speech
+from app.services.clients import (
+    get_openai_client,
+    get_google_speech_client,
+    get_azure_speech_config,
+    get_stt_executor
+)
+from app.services.rate_limit import get_limiter
+from app.services.circuit_breaker import get_breaker
+from app.services import tracing
+from app.services.audio_preprocess import PreparedAudio, prepare_audio, TARGET_SAMPLE_RATE
+
+# 녹음의 디코딩/무음 제거/모노 변환/리샘플링 사용 여부 (형식 판별은 항상 수행)
+STT_PREPROCESS = os.getenv("STT_PREPROCESS", "True").lower() == "true"
+
+# 프로바이더별 전처리 샘플레이트
+# (Whisper는 내부적으로 16kHz로 변환, Azure는 16kHz PCM 권장, Google은 16kHz 이상 권장)
+STT_SAMPLE_RATES = {
+    "openai": int(os.getenv("OPENAI_STT_SAMPLE_RATE", "16000")),
+    "azure": int(os.getenv("AZURE_STT_SAMPLE_RATE", "16000")),
+    "google": int(os.getenv("GOOGLE_STT_SAMPLE_RATE", "16000"))
+}
+
+# 메모리 버퍼(bytes, bytearray, memoryview), 파일 객체 또는 파일 경로
+AudioInput = Union[bytes, bytearray, memoryview, BinaryIO, str, os.PathLike]
+
+def _is_path(audio: AudioInput) -> bool:
+    return isinstance(audio, (str, os.PathLike))
+
+def _audio_bytes(audio: AudioInput) -> bytes:
+    """SDK에 넘길 bytes (이미 bytes면 복사하지 않음)"""
+    if isinstance(audio, bytes):
+        return audio
+    if isinstance(audio, (bytearray, memoryview)):
+        return bytes(audio)
+    if _is_path(audio):
+        with open(audio, "rb") as audio_file:
+            return audio_file.read()
+    return audio.read()
 
 class STTService:
     def __init__(self, service_type: str):
         self.service_type = service_type
         
-    async def speech_to_text(self, audio_file_path: str) -> str:
-        """음성 파일을 텍스트로 변환"""
+    async def speech_to_text(self, audio: AudioInput, filename: str = "audio.wav") -> str:
+        """음성을 텍스트로 변환
+        
+        audio는 메모리 버퍼, 파일 객체, 파일 경로 중 하나이며 디스크를 거치지 않고
+        프로바이더에 전달한다. filename은 형식을 판별할 수 없을 때 사용할 이름이다.
+        """
         if self.service_type == "openai":
-            return await self._openai_stt(audio_file_path)
+            provider_call = self._openai_stt
         elif self.service_type == "azure":
-            return await self._azure_stt(audio_file_path)
+            provider_call = self._azure_stt
         elif self.service_type == "google":
-            return await self._google_stt(audio_file_path)
+            provider_call = self._google_stt
         else:
             raise ValueError(f"Unsupported STT service: {self.service_type}")
-    
-    async def _openai_stt(self, audio_file_path: str) -> str:
-        """OpenAI Whisper STT"""
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OpenAI API key not found")
-        
-        client = openai.OpenAI(api_key=api_key)
         
-        with open(audio_file_path, "rb") as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language="ko"  # 한국어 설정
-            )
+        # 형식 판별과 전처리는 CPU 작업이므로 스레드 풀에서 실행
+        loop = asyncio.get_running_loop()
+        prepared = await loop.run_in_executor(get_stt_executor(), self._prepare, audio, filename)
         
+        # STT는 필수 단계이므로 포화/차단 시 ProviderOverloaded를 그대로 전달
+        name = f"{self.service_type}_stt"
+        breaker = get_breaker(name)
+        breaker.check()
+        async with get_limiter(name).limit():
+            async with breaker.call():
+                tracing.annotate(encoding=prepared.encoding, audio_bytes=len(prepared.content))
+                return await provider_call(prepared)
+    
+    def _prepare(self, audio: AudioInput, filename: str) -> PreparedAudio:
+        return prepare_audio(
+            _audio_bytes(audio),
+            filename,
+            process=STT_PREPROCESS,
+            sample_rate=STT_SAMPLE_RATES.get(self.service_type, TARGET_SAMPLE_RATE)
+        )
+    
+    async def _openai_stt(self, prepared: PreparedAudio) -> str:
+        """OpenAI Whisper STT (공용 비동기 클라이언트)"""
+        transcript = await get_openai_client().audio.transcriptions.create(
+            model="whisper-1",
+            file=(prepared.filename, prepared.content),
+            language="ko"  # 한국어 설정
+        )
         return transcript.text
     
-    async def _azure_stt(self, audio_file_path: str) -> str:
-        """Azure Speech-to-Text"""
-        speech_key = os.getenv("AZURE_SPEECH_KEY")
-        speech_region = os.getenv("AZURE_SPEECH_REGION")
-        
-        if not speech_key or not speech_region:
-            raise ValueError("Azure Speech credentials not found")
-        
-        speech_config = speechsdk.SpeechConfig(
-            subscription=speech_key, 
-            region=speech_region
+    async def _azure_stt(self, prepared: PreparedAudio) -> str:
+        """Azure Speech-to-Text (비동기 API가 없으므로 제한된 스레드 풀에서 실행)"""
+        speech_config = get_azure_speech_config()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_stt_executor(), self._azure_recognize, speech_config, prepared
         )
-        speech_config.speech_recognition_language = "ko-KR"
-        
-        audio_config = speechsdk.audio.AudioConfig(filename=audio_file_path)
+    
+    def _azure_recognize(self, speech_config: speechsdk.SpeechConfig, prepared: PreparedAudio) -> str:
+        """Azure 1회 인식 (SDK가 파일 경로를 요구하므로 임시 파일 사용)"""
+        suffix = os.path.splitext(prepared.filename)[1] or ".wav"
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+            tmp_file.write(prepared.content)
+            tmp_file_path = tmp_file.name
+        try:
+            return self._azure_recognize_file(speech_config, tmp_file_path)
+        finally:
+            os.unlink(tmp_file_path)
+    
+    def _azure_recognize_file(self, speech_config: speechsdk.SpeechConfig, audio_file_path: str) -> str:
+        audio_config = speechsdk.audio.AudioConfig(filename=str(audio_file_path))
         speech_recognizer = speechsdk.SpeechRecognizer(
             speech_config=speech_config, 
             audio_config=audio_config
@@ -66,30 +127,22 @@ class STTService:
         else:
             raise Exception(f"Speech recognition failed: {result.reason}")
     
-    async def _google_stt(self, audio_file_path: str) -> str:
-        """Google Cloud Speech-to-Text"""
-        credentials_path = os.getenv("GOOGLE_CLOUD_CREDENTIALS")
-        if not credentials_path:
-            raise ValueError("Google Cloud credentials not found")
-        
-        # 환경변수 설정
-        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = credentials_path
-        
-        client = speech.SpeechClient()
+    async def _google_stt(self, prepared: PreparedAudio) -> str:
+        """Google Cloud Speech-to-Text (공용 비동기 gRPC 클라이언트)"""
+        client = get_google_speech_client()
         
-        with open(audio_file_path, "rb") as audio_file:
-            content = audio_file.read()
-        
-        audio = speech.RecognitionAudio(content=content)
+        recognition_audio = speech.RecognitionAudio(content=prepared.content)
         config = speech.RecognitionConfig(
-            encoding=speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
-            sample_rate_hertz=16000,
+            encoding=getattr(speech.RecognitionConfig.AudioEncoding, prepared.encoding),
             language_code="ko-KR",
         )
+        # 샘플레이트를 알 수 없는 형식(WAV 원본, MP3)은 헤더에서 판단하도록 생략
+        if prepared.sample_rate:
+            config.sample_rate_hertz = prepared.sample_rate
         
-        response = client.recognize(config=config, audio=audio)
+        response = await client.recognize(config=config, audio=recognition_audio)
         
         if response.results:
             return response.results[0].alternatives[0].transcript
         else:
-            return "음성을 인식할 수 없습니다."
\ No newline at end of file
+            return "음성을 인식할 수 없습니다."
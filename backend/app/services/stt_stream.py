@@ -0,0 +1,336 @@
+import io
+import os
+import time
+import wave
+import asyncio
+from abc import ABC, abstractmethod
+from typing import List, Optional
+import numpy as np
+import azure.cognitiveservices.speech as speechsdk
+from google.cloud import speech
+from app.services.clients import (
+    get_openai_client,
+    get_google_speech_client,
+    get_azure_speech_config,
+    get_stt_executor
+)
+from app.services.audio_preprocess import VAD_FRAME_SECONDS, VAD_MIN_RMS
+
+NO_SPEECH = "음성을 인식할 수 없습니다."
+# Whisper는 스트리밍을 지원하지 않으므로 이 간격(초)마다 최근 오디오로 중간 결과를 만든다 (0이면 사용 안 함)
+WHISPER_PARTIAL_INTERVAL = float(os.getenv("STT_STREAM_WHISPER_PARTIAL_INTERVAL", "2.0"))
+# 중간 결과 요청에 보내는 최대 오디오 길이(초) - 발화가 길어져도 요청 크기가 늘어나지 않음
+WHISPER_PARTIAL_WINDOW = float(os.getenv("STT_STREAM_WHISPER_PARTIAL_WINDOW", "8.0"))
+# 서버 측 발화 끝 감지 사용 여부 (Google single_utterance, Azure 인식 완료 이벤트, Whisper는 PCM 무음 길이)
+STT_STREAM_ENDPOINTING = os.getenv("STT_STREAM_ENDPOINTING", "True").lower() == "true"
+# Whisper(PCM)에서 음성 뒤에 이 길이(초)만큼 무음이 이어지면 발화가 끝난 것으로 판단
+ENDPOINT_SILENCE_SECONDS = float(os.getenv("STT_STREAM_ENDPOINT_SILENCE", "0.8"))
+# LINEAR16에서 샘플레이트를 지정하지 않았을 때 사용 (WEBM_OPUS는 컨테이너 헤더의 값을 사용)
+DEFAULT_PCM_SAMPLE_RATE = 16000
+
+class StreamingRecognizer(ABC):
+    """발화 중에 오디오 청크를 받아 인식하는 스트리밍 STT
+
+    write()로 넣은 오디오의 중간 인식 결과는 partials 큐에 쌓이고,
+    finish()는 발화가 끝났을 때 최종 인식 결과를 반환한다.
+    프로바이더가 발화 끝을 감지하면 ended가 설정되며, 이후에 들어온 오디오는 인식하지 않는다.
+    encoding은 LINEAR16(16bit mono PCM) 또는 WEBM_OPUS를 사용한다.
+    sample_rate는 클라이언트가 보내는 오디오의 값이며, WEBM_OPUS(브라우저는 보통 48kHz)에서
+    지정하지 않으면 None으로 두고 프로바이더가 헤더에서 읽게 한다.
+    """
+
+    def __init__(self, encoding: str = "LINEAR16", sample_rate: Optional[int] = None):
+        self.encoding = encoding.upper()
+        if sample_rate is None and self.encoding == "LINEAR16":
+            sample_rate = DEFAULT_PCM_SAMPLE_RATE
+        self.sample_rate = sample_rate
+        self.partials: asyncio.Queue = asyncio.Queue()
+        self.ended = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._finals: List[str] = []
+
+    def _mark_ended(self):
+        # Azure SDK 콜백 스레드에서도 호출됨
+        self._loop.call_soon_threadsafe(self.ended.set)
+
+    def _emit_partial(self, pending: str = ""):
+        # Azure SDK 콜백 스레드에서도 호출되므로 이벤트 루프에 넘겨서 큐에 넣음
+        text = self._transcript(pending)
+        self._loop.call_soon_threadsafe(self.partials.put_nowait, text)
+
+    def _transcript(self, pending: str = "") -> str:
+        return " ".join(part.strip() for part in self._finals + [pending] if part.strip())
+
+    async def start(self):
+        pass
+
+    @abstractmethod
+    async def write(self, chunk: bytes):
+        ...
+
+    @abstractmethod
+    async def finish(self) -> str:
+        ...
+
+    async def close(self):
+        """인식 중단 및 리소스 정리 (finish 이후에 호출해도 됨)"""
+        pass
+
+class GoogleStreamingRecognizer(StreamingRecognizer):
+    """Google Cloud Speech streaming_recognize (비동기 gRPC 양방향 스트림)"""
+
+    def __init__(self, encoding: str = "LINEAR16", sample_rate: Optional[int] = None):
+        super().__init__(encoding, sample_rate)
+        self._audio: asyncio.Queue = asyncio.Queue()
+        self._result: Optional[asyncio.Task] = None
+
+    async def start(self):
+        client = get_google_speech_client()
+        config = speech.StreamingRecognitionConfig(
+            config=speech.RecognitionConfig(
+                encoding=getattr(speech.RecognitionConfig.AudioEncoding, self.encoding),
+                # 0(미지정)이면 WEBM_OPUS 헤더의 샘플레이트를 사용
+                sample_rate_hertz=self.sample_rate or 0,
+                language_code="ko-KR",
+            ),
+            interim_results=True,
+            # 발화가 끝나면 서버가 END_OF_SINGLE_UTTERANCE를 보내고 최종 결과 후 스트림을 닫음
+            single_utterance=STT_STREAM_ENDPOINTING
+        )
+        self._result = asyncio.create_task(self._run(client, config))
+        self._result.add_done_callback(lambda _: self.ended.set())
+
+    async def _requests(self, config):
+        # 첫 요청은 인식 설정, 이후는 오디오
+        yield speech.StreamingRecognizeRequest(streaming_config=config)
+        while True:
+            chunk = await self._audio.get()
+            if chunk is None:
+                return
+            yield speech.StreamingRecognizeRequest(audio_content=chunk)
+
+    async def _run(self, client, config) -> str:
+        responses = await client.streaming_recognize(requests=self._requests(config))
+        end_of_utterance = speech.StreamingRecognizeResponse.SpeechEventType.END_OF_SINGLE_UTTERANCE
+        async for response in responses:
+            if response.speech_event_type == end_of_utterance:
+                self.ended.set()
+            for result in response.results:
+                if not result.alternatives:
+                    continue
+                transcript = result.alternatives[0].transcript
+                if result.is_final:
+                    self._finals.append(transcript)
+                    self._emit_partial()
+                else:
+                    self._emit_partial(transcript)
+        return self._transcript()
+
+    async def write(self, chunk: bytes):
+        if not self.ended.is_set():
+            self._audio.put_nowait(bytes(chunk))
+
+    async def finish(self) -> str:
+        self._audio.put_nowait(None)
+        return await self._result or NO_SPEECH
+
+    async def close(self):
+        if self._result is not None and not self._result.done():
+            self._result.cancel()
+
+class AzureStreamingRecognizer(StreamingRecognizer):
+    """Azure 연속 인식 + PushAudioInputStream"""
+
+    def __init__(self, encoding: str = "LINEAR16", sample_rate: Optional[int] = None):
+        super().__init__(encoding, sample_rate)
+        self._stream: Optional[speechsdk.audio.PushAudioInputStream] = None
+        self._recognizer: Optional[speechsdk.SpeechRecognizer] = None
+        self._stopped: Optional[asyncio.Future] = None
+
+    async def start(self):
+        speech_config = get_azure_speech_config()
+
+        if self.encoding == "LINEAR16":
+            stream_format = speechsdk.audio.AudioStreamFormat(samples_per_second=self.sample_rate)
+        else:
+            # 압축 포맷은 SDK가 GStreamer로 디코딩
+            stream_format = speechsdk.audio.AudioStreamFormat(
+                compressed_stream_format=speechsdk.AudioStreamContainerFormat.ANY
+            )
+        self._stream = speechsdk.audio.PushAudioInputStream(stream_format=stream_format)
+        self._recognizer = speechsdk.SpeechRecognizer(
+            speech_config=speech_config,
+            audio_config=speechsdk.audio.AudioConfig(stream=self._stream)
+        )
+        self._stopped = self._loop.create_future()
+
+        self._recognizer.recognizing.connect(lambda evt: self._emit_partial(evt.result.text))
+        self._recognizer.recognized.connect(self._on_recognized)
+        self._recognizer.canceled.connect(self._on_canceled)
+        self._recognizer.session_stopped.connect(lambda evt: self._set_stopped())
+
+        await self._loop.run_in_executor(
+            get_stt_executor(), lambda: self._recognizer.start_continuous_recognition_async().get()
+        )
+
+    def _on_recognized(self, evt):
+        if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
+            self._finals.append(evt.result.text)
+            self._emit_partial()
+            # 인식 완료 이벤트는 SDK가 무음으로 발화 구간을 나눈 결과
+            if STT_STREAM_ENDPOINTING:
+                self._mark_ended()
+
+    def _on_canceled(self, evt):
+        if evt.cancellation_details.reason == speechsdk.CancellationReason.Error:
+            self._set_stopped(Exception(f"Speech recognition failed: {evt.cancellation_details.error_details}"))
+        else:
+            self._set_stopped()
+
+    def _set_stopped(self, error: Optional[Exception] = None):
+        self._mark_ended()
+
+        def resolve():
+            if self._stopped.done():
+                return
+            if error is not None:
+                self._stopped.set_exception(error)
+            else:
+                self._stopped.set_result(None)
+        self._loop.call_soon_threadsafe(resolve)
+
+    async def write(self, chunk: bytes):
+        if not self.ended.is_set():
+            self._stream.write(bytes(chunk))
+
+    async def finish(self) -> str:
+        # 입력 스트림을 닫으면 남은 오디오를 인식한 뒤 세션이 종료됨
+        self._stream.close()
+        await self._stopped
+        return self._transcript() or NO_SPEECH
+
+    async def close(self):
+        if self._recognizer is None:
+            return
+        self._stream.close()
+        recognizer, self._recognizer = self._recognizer, None
+        await self._loop.run_in_executor(
+            get_stt_executor(), lambda: recognizer.stop_continuous_recognition_async().get()
+        )
+
+class WhisperChunkedRecognizer(StreamingRecognizer):
+    """Whisper 청크 인식
+
+    스트리밍 API가 없으므로 오디오를 모아 두었다가 일정 간격으로 최근 오디오(최대
+    WHISPER_PARTIAL_WINDOW초)를 인식해 중간 결과를 만들고, 발화가 끝나면 전체 오디오로
+    최종 결과를 만든다. 구간이 가득 차면 그 인식 결과를 확정하고 다음 구간을 시작하므로
+    중간 결과 비용은 발화 길이에 비례한다. 중간 결과 요청은 한 번에 하나만 보낸다.
+    PCM이면 음성 뒤에 ENDPOINT_SILENCE_SECONDS만큼 무음이 이어질 때 발화 끝으로 판단한다.
+    """
+
+    def __init__(self, encoding: str = "LINEAR16", sample_rate: Optional[int] = None):
+        super().__init__(encoding, sample_rate)
+        self._buffer = bytearray()
+        self._partial_task: Optional[asyncio.Task] = None
+        self._started = time.monotonic()
+        self._last_partial = self._started
+        self._window_start = 0  # 아직 확정하지 않은 중간 결과 구간의 시작 (PCM 바이트)
+        self._speech_seen = False
+        self._silence = 0.0
+
+    @property
+    def _pcm(self) -> bool:
+        return self.encoding == "LINEAR16"
+
+    async def write(self, chunk: bytes):
+        if self.ended.is_set():
+            return
+        self._buffer += chunk
+        if self._pcm and STT_STREAM_ENDPOINTING:
+            self._detect_endpoint(chunk)
+        now = time.monotonic()
+        if (WHISPER_PARTIAL_INTERVAL > 0
+                and now - self._last_partial >= WHISPER_PARTIAL_INTERVAL
+                and (self._partial_task is None or self._partial_task.done())):
+            self._last_partial = now
+            if self._pcm:
+                self._partial_task = asyncio.create_task(self._partial(len(self._buffer)))
+            elif now - self._started <= WHISPER_PARTIAL_WINDOW:
+                # 압축 포맷은 중간부터 잘라 보낼 수 없으므로 구간 길이까지만 전체 오디오로 중간 결과 생성
+                self._partial_task = asyncio.create_task(self._partial(len(self._buffer)))
+
+    def _detect_endpoint(self, chunk: bytes):
+        """프레임 RMS로 음성 뒤의 무음 길이를 재서 발화 끝 감지"""
+        samples = np.frombuffer(chunk[: len(chunk) - len(chunk) % 2], dtype="<i2").astype(np.float32) / 32768
+        frame = max(1, int(self.sample_rate * VAD_FRAME_SECONDS))
+        for start in range(0, len(samples), frame):
+            part = samples[start:start + frame]
+            if float(np.sqrt(np.mean(part ** 2))) > VAD_MIN_RMS:
+                self._speech_seen = True
+                self._silence = 0.0
+            elif self._speech_seen:
+                self._silence += len(part) / self.sample_rate
+        if self._speech_seen and self._silence >= ENDPOINT_SILENCE_SECONDS:
+            self.ended.set()
+
+    async def _partial(self, end: int):
+        end -= end % 2  # 16bit 샘플 경계
+        start = self._window_start if self._pcm else 0
+        audio = bytes(self._buffer[start:end])
+        try:
+            text = await self._transcribe(audio)
+        except Exception as e:
+            print(f"Whisper partial transcription failed: {e}")
+            return
+        if self._pcm and len(audio) >= WHISPER_PARTIAL_WINDOW * self.sample_rate * 2:
+            # 구간이 가득 찼으면 결과를 확정하고 다음 중간 결과는 이후 오디오만 인식
+            self._finals.append(text)
+            self._window_start = end
+            self._emit_partial()
+        elif self._pcm:
+            self._emit_partial(text)
+        else:
+            self._finals = [text]
+            self._emit_partial()
+
+    async def finish(self) -> str:
+        await self.close()
+        if not self._buffer:
+            return NO_SPEECH
+        return await self._transcribe(bytes(self._buffer)) or NO_SPEECH
+
+    async def close(self):
+        if self._partial_task is not None and not self._partial_task.done():
+            self._partial_task.cancel()
+
+    def _audio_file(self, audio: bytes) -> tuple:
+        if self.encoding != "LINEAR16":
+            return ("audio.webm", audio)
+        # PCM은 WAV 헤더를 붙여서 전송
+        wav = io.BytesIO()
+        with wave.open(wav, "wb") as writer:
+            writer.setnchannels(1)
+            writer.setsampwidth(2)
+            writer.setframerate(self.sample_rate)
+            writer.writeframes(audio)
+        return ("audio.wav", wav.getvalue())
+
+    async def _transcribe(self, audio: bytes) -> str:
+        transcript = await get_openai_client().audio.transcriptions.create(
+            model="whisper-1",
+            file=self._audio_file(audio),
+            language="ko"
+        )
+        return transcript.text
+
+_RECOGNIZERS = {
+    "google": GoogleStreamingRecognizer,
+    "azure": AzureStreamingRecognizer,
+    "openai": WhisperChunkedRecognizer,
+}
+
+def create_recognizer(service_type: str, encoding: str = "LINEAR16", sample_rate: Optional[int] = None) -> StreamingRecognizer:
+    recognizer_class = _RECOGNIZERS.get(service_type)
+    if recognizer_class is None:
+        raise ValueError(f"Unsupported STT service: {service_type}")
+    return recognizer_class(encoding, sample_rate)
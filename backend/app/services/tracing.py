@@ -0,0 +1,92 @@
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+# 한 턴의 처리 과정 기록
+#
+# 요청 처리 코드가 start_trace()로 추적을 시작하면 같은 컨텍스트에서 실행되는
+# (그리고 그 안에서 만든 작업에 복사되는) 프로바이더 호출, 캐시 조회가 자동으로 기록된다.
+# 추적 중이 아니면 모든 기록 함수는 아무 일도 하지 않는다.
+
+TRACE_VERSION = 1
+
+_current_trace: ContextVar[Optional["TurnTrace"]] = ContextVar("turn_trace", default=None)
+_current_call: ContextVar[Optional[Dict[str, Any]]] = ContextVar("turn_trace_call", default=None)
+
+class TurnTrace:
+    """단계 타이밍, 프로바이더 호출(모델, 토큰 수), 캐시 적중 기록"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.calls: List[Dict[str, Any]] = []
+        self.caches: Dict[str, str] = {}
+
+    def to_dict(self, ctx=None, pipeline: Optional[str] = None) -> Dict[str, Any]:
+        """저장용 요약 (시각은 모두 추적 시작 기준 ms)
+
+        stages: {단계: [시작, 소요 시간, 상태]}, calls: 호출 순서대로 프로바이더 호출 목록
+        (같은 단계의 호출이 여러 개면 재시도/헤지/보조 프로바이더 전환)
+        """
+        trace: Dict[str, Any] = {"v": TRACE_VERSION}
+        if pipeline:
+            trace["pipeline"] = pipeline
+        if ctx is not None:
+            trace["total_ms"] = round(ctx.elapsed_ms(), 1)
+            # 파이프라인 시작 시각과 추적 시작 시각의 차이 보정
+            shift = (ctx._started - self.started) * 1000 if ctx._started else 0.0
+            trace["stages"] = {
+                name: [round(timing["start_ms"] + shift, 1), timing["duration_ms"], timing["status"]]
+                for name, timing in ctx.timings.items()
+            }
+        calls = []
+        for call in self.calls:
+            entry = {"provider": call["provider"], "start_ms": round((call["_started"] - self.started) * 1000, 1)}
+            entry.update((key, value) for key, value in call.items() if key not in entry and key != "_started" and value is not None)
+            calls.append(entry)
+        if calls:
+            trace["calls"] = calls
+        if self.caches:
+            trace["cache"] = dict(self.caches)
+        return trace
+
+def start_trace() -> TurnTrace:
+    """현재 컨텍스트에서 새 추적 시작 (이후에 만든 작업에도 전달됨)"""
+    trace = TurnTrace()
+    _current_trace.set(trace)
+    return trace
+
+def current_trace() -> Optional[TurnTrace]:
+    return _current_trace.get()
+
+def begin_call(provider: str):
+    """프로바이더 호출 기록 시작 (end_call에 넘길 토큰 반환, 추적 중이 아니면 None)"""
+    trace = _current_trace.get()
+    if trace is None:
+        return None
+    call = {"provider": provider, "_started": time.monotonic()}
+    trace.calls.append(call)
+    return call, _current_call.set(call)
+
+def end_call(token, status: str):
+    """호출 기록 종료 (status: ok, error, cancelled)"""
+    if token is None:
+        return
+    call, reset = token
+    call["duration_ms"] = round((time.monotonic() - call["_started"]) * 1000, 1)
+    call["status"] = status
+    try:
+        _current_call.reset(reset)
+    except ValueError:
+        # 스트림을 다른 작업에서 닫은 경우 (기록은 이미 끝났으므로 무시)
+        pass
+
+def annotate(**fields: Any):
+    """진행 중인 프로바이더 호출에 모델, 토큰 수 등 추가"""
+    call = _current_call.get()
+    if call is not None:
+        call.update(fields)
+
+def record_cache(name: str, hit: bool):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.caches[name] = "hit" if hit else "miss"
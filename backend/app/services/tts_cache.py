@@ -0,0 +1,46 @@
+import hashlib
+from typing import Optional, Dict, Any
+from app.services.audio_store import LocalAudioStore
+
+class TTSAudioCache:
+    """합성된 음성 파일 캐시 (내용 주소 방식)
+
+    (모듈, 음성, 설정, 텍스트)의 해시를 파일 이름으로 사용하므로 같은 문장은
+    한 번만 합성해서 저장한다. 보관 기간과 전체 크기 제한은 저장소 정리 작업이
+    담당하며, 적중 시 사용 시각을 갱신해 자주 쓰이는 파일은 늦게 삭제되게 한다.
+    """
+
+    def __init__(self, store: LocalAudioStore, extension: str = ".mp3"):
+        self.store = store
+        self.extension = extension
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(*parts: Optional[str]) -> str:
+        joined = "\x1f".join(part or "" for part in parts)
+        return hashlib.sha256(joined.encode()).hexdigest()
+
+    def _filename(self, key: str) -> str:
+        return f"tts_{key}{self.extension}"
+
+    def get(self, key: str) -> Optional[str]:
+        filename = self._filename(key)
+        if self.store.exists(filename):
+            self.store.touch(filename)
+            self.hits += 1
+            return self.store.url(filename)
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, audio: bytes) -> str:
+        return await self.store.put(self._filename(key), audio)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            **self.store.stats()
+        }
@@ -1,9 +1,29 @@
 import os
-import tempfile
-import uuid
-from typing import Optional
-from elevenlabs import generate, save
+from collections import deque
+from typing import Optional, List, Dict, Any, AsyncIterator
+from elevenlabs import generate
 import asyncio
+from app.services.sentence_segmenter import SentenceSegmenter
+from app.services.singleflight import SingleFlight
+from app.services import tracing
+from app.services.rate_limit import get_limiter, ProviderOverloaded
+from app.services.circuit_breaker import get_breaker
+from app.services.tts_cache import TTSAudioCache
+from app.services.audio_store import get_audio_store
+
+ELEVENLABS_VOICE = os.getenv("ELEVENLABS_VOICE", "Bella")
+ELEVENLABS_MODEL = os.getenv("ELEVENLABS_MODEL", "eleven_monolingual_v1")
+ELEVENLABS_OUTPUT_FORMAT = "mp3_44100_128"
+# 스트리밍 합성 시 동시에 합성할 문장 수
+TTS_STREAM_PARALLEL = int(os.getenv("TTS_STREAM_PARALLEL", "2"))
+# 서버에서 음성 파일을 합성하는 모듈 (그 외 모듈은 프론트엔드에서 처리하거나 아직 미지원)
+SERVER_SIDE_TTS = ("elevenlabs",)
+
+# 동일 문장에 대한 동시 음성 합성 요청은 한 번만 호출
+_inflight = SingleFlight()
+
+# 인사말/안내 문구처럼 반복되는 문장은 한 번 합성한 파일을 재사용
+tts_cache = TTSAudioCache(get_audio_store())
 
 class TTSService:
     def __init__(self, service_type: str):
@@ -15,12 +35,49 @@ class TTSService:
             # 브라우저 TTS는 프론트엔드에서 처리
             return None
         elif self.service_type == "elevenlabs":
-            return await self._elevenlabs_tts(text)
+            cache_key = tts_cache.make_key(
+                self.service_type, ELEVENLABS_VOICE, ELEVENLABS_MODEL, ELEVENLABS_OUTPUT_FORMAT, text.strip()
+            )
+            audio_url = tts_cache.get(cache_key)
+            tracing.record_cache("tts", audio_url is not None)
+            if audio_url is not None:
+                return audio_url
+            return await _inflight.do(
+                ("tts", cache_key),
+                lambda: self._guarded_call(self._elevenlabs_tts, text, cache_key)
+            )
         else:
             raise ValueError(f"Unsupported TTS service: {self.service_type}")
     
-    async def _elevenlabs_tts(self, text: str) -> Optional[str]:
-        """ElevenLabs TTS"""
+    @property
+    def server_side(self) -> bool:
+        """서버에서 음성 파일을 만드는 모듈인지 (browser는 프론트엔드에서 합성)"""
+        return self.service_type in SERVER_SIDE_TTS
+    
+    def open_stream(self) -> "SpeechStream":
+        """LLM 출력처럼 조금씩 들어오는 텍스트를 문장 단위로 합성하는 스트림"""
+        return SpeechStream(self, TTS_STREAM_PARALLEL)
+    
+    async def _guarded_call(self, provider_call, text: str, cache_key: str) -> Optional[str]:
+        # TTS는 선택 단계이므로 차단기가 열려 있거나 포화 상태면 즉시 음성 없이 응답 (TPM은 글자 수 기준)
+        breaker = get_breaker(self.service_type)
+        try:
+            breaker.check()
+            async with get_limiter(self.service_type).limit(len(text)):
+                async with breaker.call():
+                    audio = await provider_call(text)
+        except ProviderOverloaded as e:
+            print(f"TTS skipped: {e}")
+            return None
+        except Exception as e:
+            print(f"TTS failed: {e}")
+            return None
+        if audio is None:
+            return None
+        return await tts_cache.put(cache_key, audio)
+    
+    async def _elevenlabs_tts(self, text: str) -> Optional[bytes]:
+        """ElevenLabs TTS (합성된 MP3 바이트 반환)"""
         api_key = os.getenv("ELEVENLABS_API_KEY")
         if not api_key:
             print("ElevenLabs API key not found")
@@ -31,26 +88,80 @@ class TTSService:
             def generate_audio():
                 audio = generate(
                     text=text,
-                    voice="Bella",  # 기본 음성
+                    voice=ELEVENLABS_VOICE,
+                    model=ELEVENLABS_MODEL,
+                    output_format=ELEVENLABS_OUTPUT_FORMAT,
                     api_key=api_key
                 )
                 return audio
             
+            tracing.annotate(model=ELEVENLABS_MODEL, voice=ELEVENLABS_VOICE, characters=len(text))
             # 비동기로 실행
-            audio = await asyncio.get_event_loop().run_in_executor(
+            return await asyncio.get_event_loop().run_in_executor(
                 None, generate_audio
             )
             
-            # 임시 파일로 저장
-            audio_filename = f"audio_{uuid.uuid4().hex}.mp3"
-            audio_path = os.path.join(tempfile.gettempdir(), audio_filename)
-            
-            save(audio, audio_path)
-            
-            # 실제 서비스에서는 클라우드 스토리지나 CDN에 업로드 후 URL 반환
-            # 여기서는 로컬 파일 경로를 반환 (개발용)
-            return f"http://localhost:8000/static/audio/{audio_filename}"
-            
         except Exception as e:
             print(f"ElevenLabs TTS error: {e}")
-            return None
\ No newline at end of file
+            raise
+
+class SpeechStream:
+    """문장 단위 파이프라인 음성 합성
+
+    feed()로 텍스트 조각을 넣으면 문장이 완성되는 즉시 합성을 시작하고(최대 max_parallel개 동시),
+    ready()/remaining()은 합성 결과를 문장 순서대로 돌려준다. 합성에 실패한 문장은
+    audio_url이 None인 결과로 순서를 유지한다.
+    """
+    
+    def __init__(self, service: TTSService, max_parallel: int = 2):
+        self.service = service
+        self._segmenter = SentenceSegmenter()
+        self._semaphore = asyncio.Semaphore(max_parallel)
+        self._pending: deque = deque()  # (순번, 문장, 합성 작업)
+        self._next_index = 0
+    
+    def feed(self, text: str):
+        for sentence in self._segmenter.feed(text):
+            self._start(sentence)
+    
+    def close(self):
+        """입력 종료: 남은 텍스트를 마지막 문장으로 합성"""
+        sentence = self._segmenter.flush()
+        if sentence:
+            self._start(sentence)
+    
+    def _start(self, sentence: str):
+        task = asyncio.ensure_future(self._synthesize(sentence))
+        self._pending.append((self._next_index, sentence, task))
+        self._next_index += 1
+    
+    async def _synthesize(self, sentence: str) -> Optional[str]:
+        async with self._semaphore:
+            try:
+                return await self.service.text_to_speech(sentence)
+            except Exception as e:
+                # 문장 하나의 합성 실패가 LLM 응답 스트림을 중단시키지 않도록 음성 없이 진행
+                print(f"TTS failed: {e}")
+                return None
+    
+    def ready(self) -> List[Dict[str, Any]]:
+        """앞 문장부터 순서대로 이미 합성이 끝난 결과 (기다리지 않음)"""
+        segments = []
+        while self._pending and self._pending[0][2].done():
+            index, sentence, task = self._pending.popleft()
+            segments.append(_segment(index, sentence, task.result()))
+        return segments
+    
+    async def remaining(self) -> AsyncIterator[Dict[str, Any]]:
+        """남은 결과를 순서대로 기다려서 반환 (close() 이후 호출)"""
+        while self._pending:
+            index, sentence, task = self._pending.popleft()
+            yield _segment(index, sentence, await task)
+    
+    def cancel(self):
+        while self._pending:
+            _, _, task = self._pending.popleft()
+            task.cancel()
+
+def _segment(index: int, sentence: str, audio_url: Optional[str]) -> Dict[str, Any]:
+    return {"index": index, "text": sentence, "audio_url": audio_url}
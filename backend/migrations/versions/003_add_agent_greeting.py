@@ -0,0 +1,32 @@
+"""Add precomputed greeting columns
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Add greeting columns (versioned by a hash of the generation inputs)
+    op.add_column('agents', sa.Column('greeting', sa.Text(), nullable=True))
+    op.add_column('agents', sa.Column('greeting_audio_url', sa.String(length=500), nullable=True))
+    op.add_column('agents', sa.Column('greeting_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    # Remove greeting columns
+    op.drop_column('agents', 'greeting_hash')
+    op.drop_column('agents', 'greeting_audio_url')
+    op.drop_column('agents', 'greeting')
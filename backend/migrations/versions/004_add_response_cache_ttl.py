@@ -0,0 +1,28 @@
+"""Add per-agent response cache TTL
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Add response_cache_ttl column (seconds, 0 disables caching)
+    op.add_column('agents', sa.Column('response_cache_ttl', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    # Remove response_cache_ttl column
+    op.drop_column('agents', 'response_cache_ttl')
@@ -0,0 +1,27 @@
+"""Add per-agent emotion analysis deadline
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Add emotion_deadline_ms column (NULL waits for emotion analysis to finish)
+    op.add_column('agents', sa.Column('emotion_deadline_ms', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    # Remove emotion_deadline_ms column
+    op.drop_column('agents', 'emotion_deadline_ms')
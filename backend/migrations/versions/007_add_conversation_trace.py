@@ -0,0 +1,31 @@
+"""Add per-turn processing trace to conversations
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Add trace column (stage timings, provider calls, cache hits per turn)
+    op.add_column('conversations', sa.Column('trace', postgresql.JSON(astext_type=sa.Text()), nullable=True))
+    # Index for per-agent time range queries
+    op.create_index('ix_conversations_agent_id_created_at', 'conversations', ['agent_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    # Remove trace column and index
+    op.drop_index('ix_conversations_agent_id_created_at', table_name='conversations')
+    op.drop_column('conversations', 'trace')
@@ -62,6 +62,7 @@ const sttOptions: ModuleOption[] = [
 const emotionOptions: ModuleOption[] = [
   { value: 'hume', label: 'Hume AI', description: '감정 분석 전문' },
   { value: 'mago', label: 'Mago', description: '한국어 특화' },
+  { value: 'local', label: '내장 분석기', description: '오프라인 · 초저지연' },
   { value: 'none', label: '사용 안함', description: '감정 분석 미사용' },
 ]
 